@@ -1,9 +1,15 @@
 
 
+import io
+import hashlib
+from datetime import date
 import streamlit as st
 import pandas as pd
-import tempfile
-from graph_builder import graph  # import your compiled graph
+from graph_builder import graph, advice_graph  # import your compiled graphs
+from state import merge_portfolio
+from panel import merge_panels, stock_prices, stock_news
+from portfolio_io import read_portfolio, PortfolioValidationError
+import telemetry
 
 # --- Streamlit UI ---
 st.set_page_config(page_title="Portfolio Advicer", layout="centered")
@@ -35,46 +41,134 @@ liquidity_needs = liquidity_option
 
 uploaded_file = st.file_uploader("Upload your portfolio CSV", type=["csv"])
 
+def render_stock(stock, data):
+    # data: graph state with the panel, when PANEL_STATE is on
+    st.subheader(f"📊 {stock['ticker']}")
+
+    with st.expander("📈 Price History"):
+        st.dataframe(stock_prices(data, stock).tail())
+
+    with st.expander("📰 Recent News"):
+        st.dataframe(stock_news(data, stock).head())
+
+    with st.expander("🧠 AI Summary"):
+        st.markdown(stock.get("recommendation", "No analysis available."))
+
+
+@st.cache_data(show_spinner=False)
+def parse_portfolio(data: bytes) -> pd.DataFrame:
+    # Cached on the file bytes, so widget reruns don't re-parse the upload
+    return pd.read_csv(io.BytesIO(data))
+
+
+def stream_analysis(run_graph, state, total_tickers):
+    """Run a compiled graph, rendering results as they arrive. Returns the
+    analyzed portfolio, its price/news panel (None unless PANEL_STATE is on)
+    and the summary."""
+    progress = st.progress(0.0, text="⏳ Running analysis...")
+    node_status = st.empty()
+    stock_area = st.container()
+    st.subheader("🧾 Summary")
+    summary_area = st.empty()
+    summary_area.write("Waiting for all tickers to finish...")
+
+    done_tickers = 0
+    summary_tokens = []
+    portfolio = list(state.get("portfolio", []))
+    data = {"panel": state.get("panel")}
+    summary = None
+
+    # "updates" yields each node's output as soon as it finishes (one
+    # ticker_pipeline update per ticker); "messages" yields LLM tokens,
+    # used to stream the portfolio summary as it is written.
+    for mode, chunk in run_graph.stream(state, stream_mode=["updates", "messages"]):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") == "portfolio_summary" and message.content:
+                summary_tokens.append(message.content)
+                summary_area.markdown("".join(summary_tokens))
+            continue
+
+        for node, update in chunk.items():
+            if not update:
+                continue
+            if node == "load_portfolio":
+                portfolio = update["portfolio"]
+                total_tickers = len(portfolio)
+                node_status.write(f"✅ Portfolio loaded: {total_tickers} holdings")
+            elif node in ("ticker_pipeline", "stock_adviser"):
+                portfolio = merge_portfolio(portfolio, update["portfolio"])
+                data["panel"] = merge_panels(data["panel"], update.get("panel"))
+                with stock_area:
+                    for stock in update["portfolio"]:
+                        done_tickers += 1
+                        render_stock(stock, data)
+            elif node == "suggest_stocks":
+                node_status.write(f"✅ Screener returned {len(update.get('suggestions', []))} suggestions")
+            elif node == "portfolio_summary":
+                summary = update.get("summary")
+
+        if total_tickers:
+            progress.progress(
+                min(done_tickers / total_tickers, 1.0),
+                text=f"⏳ Analyzed {done_tickers}/{total_tickers} tickers",
+            )
+
+    progress.progress(1.0, text="✅ Analysis complete!")
+    summary_area.markdown(summary or "No summary generated.")
+    return portfolio, data["panel"], summary
+
+
 # --- Main Logic ---
 if uploaded_file:
     st.success("📂 File uploaded successfully!")
-    df = pd.read_csv(uploaded_file)
+    file_bytes = uploaded_file.getvalue()
+    fingerprint = hashlib.sha256(file_bytes).hexdigest()
+    df = parse_portfolio(file_bytes)
     st.write("🔍 Uploaded Portfolio Preview")
     st.dataframe(df)
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp:
-        df.to_csv(tmp.name, index=False)
-        csv_path = tmp.name
+    try:
+        holdings = read_portfolio(df)
+    except PortfolioValidationError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+
+    preferences = {
+        "risk_tolerance": risk_tolerance,
+        "investment_horizon": investment_horizon,
+        "objective": investment_objective,
+        "liquidity_needs": liquidity_needs,
+    }
+    # Fetched data and analyst reports are reused for the same file on the
+    # same day; only the preference-dependent nodes re-run when the
+    # preferences change.
+    analysis_key = (fingerprint, date.today().isoformat())
+    previous = st.session_state.get("analysis")
 
     if st.button("Run Portfolio Analysis"):
-        st.info("⏳ Running analysis...")
-        state = {
-            "user_uploaded_file": csv_path,
-            "risk_tolerance": risk_tolerance,
-            "investment_horizon": investment_horizon,
-            "objective": investment_objective,
-            "liquidity_needs": liquidity_needs,
-            "portfolio": [],
-            "summary": [],
-            "final_response": [],
-            "messages": []
-        }
-
-        result = graph.invoke(state)
-
-        st.success("✅ Analysis complete!")
-        
-        for stock in result["portfolio"]:
-            st.subheader(f"📊 {stock['ticker']}")
-            
-            with st.expander("📈 Price History"):
-                st.dataframe(stock["prices"].tail())
-
-            with st.expander("📰 Recent News"):
-                st.dataframe(stock["news"].head())
-
-            with st.expander("🧠 AI Summary"):
-                st.markdown(stock.get("recommendation", "No analysis available."))
-
-        st.subheader("🧾 Summary")
-        st.write(result.get("summary", "No summary generated."))
+        if previous and previous["key"] == analysis_key:
+            st.info("♻️ Reusing fetched data and analyses for this portfolio; updating advice for your preferences.")
+            state = {
+                "user_uploaded_file": uploaded_file.name,
+                **preferences,
+                "portfolio": previous["portfolio"],
+                "summary": [],
+            }
+            if previous.get("panel") is not None:
+                state["panel"] = previous["panel"]
+            portfolio, panel, summary = stream_analysis(advice_graph, state, len(previous["portfolio"]))
+        else:
+            state = {
+                "user_uploaded_file": uploaded_file.name,
+                "holdings": holdings,
+                **preferences,
+                "portfolio": [],
+                "summary": [],
+                "final_response": [],
+                "messages": []
+            }
+            portfolio, panel, summary = stream_analysis(graph, state, 0)
+
+        st.session_state["analysis"] = {"key": analysis_key, "portfolio": portfolio, "panel": panel}
+        telemetry.flush()
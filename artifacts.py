@@ -0,0 +1,63 @@
+import os
+import threading
+from collections import Counter
+from config import CACHE_DIR, LLM_MODEL, ARTIFACT_RETENTION_DAYS, ARTIFACT_STORE_MAX_MB
+from cache import DiskCache, content_key
+from memo import trading_date, digest
+import telemetry
+
+# Shared store of the ticker-level analyst reports. A price or news report
+# depends only on the ticker and its data (not on who holds it or their
+# preferences), so it is keyed by (ticker, trading date, data hash) plus
+# the model and prompt, computed once, and reused by every run, user and
+# batch worker. Only advice and the summary are produced per user.
+
+artifact_store = DiskCache(
+    os.path.join(CACHE_DIR, "analysis_artifacts.sqlite"),
+    max_bytes=ARTIFACT_STORE_MAX_MB * 1024 * 1024,
+    ttl_seconds=ARTIFACT_RETENTION_DAYS * 86400,
+)
+telemetry.register_cache("artifacts", artifact_store)
+
+_lookups = Counter()
+_lookups_lock = threading.Lock()
+
+
+def artifact_key(kind: str, ticker: str, data, prompt) -> str:
+    return content_key("artifact", kind, ticker, trading_date(), digest(data), LLM_MODEL, prompt.template)
+
+
+def load_report(kind: str, ticker: str, data, prompt) -> str | None:
+    '''
+    # Stored report for this ticker's data today, if any run produced it.
+
+    # Args:
+    #     kind (str): "price" or "news".
+    #     ticker (str): Stock ticker symbol.
+    #     data (pd.DataFrame): The prices or news the report is based on.
+    #     prompt (PromptTemplate): Prompt the report is produced with.
+
+    # Returns:
+    #     str | None: The report, or None on a miss.
+    '''
+    report = artifact_store.get(artifact_key(kind, ticker, data, prompt))
+    with _lookups_lock:
+        _lookups[kind, "hits" if report is not None else "misses"] += 1
+    return report
+
+
+def save_report(kind: str, ticker: str, data, prompt, report: str) -> None:
+    # Error reports are not shared, so a failed analysis is retried.
+    if report and not report.startswith("Error"):
+        artifact_store.put(artifact_key(kind, ticker, data, prompt), report)
+
+
+def hit_rates() -> dict:
+    # {kind: {"hits", "misses", "hit_rate"}} for this process.
+    with _lookups_lock:
+        kinds = sorted({kind for kind, _ in _lookups})
+        rates = {}
+        for kind in kinds:
+            hits, misses = _lookups[kind, "hits"], _lookups[kind, "misses"]
+            rates[kind] = {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses)}
+    return rates
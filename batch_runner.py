@@ -0,0 +1,210 @@
+"""Run the portfolio graph headlessly over many client portfolios.
+
+Run from the repo root, either over a directory of CSVs (one client per
+file, named after the file, all with the preferences given on the command
+line):
+    python batch_runner.py portfolios/ --output results/ --workers 8
+
+or over a manifest CSV with a row per client (client_id, portfolio, and
+optionally risk_tolerance, investment_horizon, objective, liquidity_needs;
+portfolio paths are relative to the manifest):
+    python batch_runner.py clients.csv --output results/
+
+Each finished client gets results/<client_id>/reports.parquet (one row per
+ticker) and results/<client_id>/result.json (summary, suggestions and the
+per-ticker reports). result.json is written last, so rerunning the same
+command resumes a partial batch by skipping clients that already have it.
+Clients whose client_id is missing, repeated, or not a plain name (letters,
+digits, '_', '.', '-') are skipped and listed in batch_stats.json.
+"""
+import os
+import re
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from config import BATCH_WORKERS
+import store_io
+
+PREFERENCE_FIELDS = ("risk_tolerance", "investment_horizon", "objective", "liquidity_needs")
+REPORT_FIELDS = (
+    "ticker", "shares_held", "buy_price", "current_price", "sector", "purchase_date",
+    "price_analyst_report", "news_analyst_report", "recommendation",
+)
+RESULT_FILE = "result.json"
+# client_id names the client's output directory, so it must be one plain
+# path component
+CLIENT_ID = re.compile(r"[\w.-]+")
+
+
+def client_id(value) -> str | None:
+    # Normalized client id, or None when it cannot name a directory
+    if pd.isna(value):
+        return None
+    value = str(value).strip()
+    if not CLIENT_ID.fullmatch(value) or value in (".", ".."):
+        return None
+    return value
+
+
+def load_jobs(source: str, defaults: dict) -> tuple[list[dict], list[dict]]:
+    '''
+    # Build the job list from a directory of CSVs or a manifest CSV.
+
+    # Args:
+    #     source (str): Directory or manifest path.
+    #     defaults (dict): Preferences for clients that do not set their own.
+
+    # Returns:
+    #     tuple[list[dict], list[dict]]: {"client_id", "portfolio",
+    #     <preferences>} per client, and {"source", "error"} per rejected
+    #     file or manifest row (missing, invalid or duplicate client_id).
+    '''
+    if os.path.isdir(source):
+        entries = [
+            (name, os.path.splitext(name)[0], os.path.join(source, name), defaults)
+            for name in sorted(os.listdir(source)) if name.lower().endswith(".csv")
+        ]
+    else:
+        manifest = pd.read_csv(source, dtype="string")
+        missing = {"client_id", "portfolio"} - set(manifest.columns)
+        if missing:
+            raise SystemExit(f"Manifest is missing column(s): {', '.join(sorted(missing))}")
+
+        base = os.path.dirname(os.path.abspath(source))
+        entries = []
+        for row_number, row in enumerate(manifest.to_dict("records"), start=2):  # header is line 1
+            prefs = {field: row[field] if pd.notna(row.get(field)) else defaults[field] for field in PREFERENCE_FIELDS}
+            portfolio = os.path.join(base, row["portfolio"]) if pd.notna(row["portfolio"]) else None
+            entries.append((f"{source} line {row_number}", row["client_id"], portfolio, prefs))
+
+    jobs, rejected, seen = [], [], set()
+    for where, raw_id, portfolio, prefs in entries:
+        cid = client_id(raw_id)
+        if cid is None:
+            error = f"invalid client_id {raw_id!r} (letters, digits, '_', '.' and '-' only)"
+        elif cid in seen:
+            error = f"duplicate client_id {cid!r}"
+        elif portfolio is None:
+            error = "missing portfolio"
+        else:
+            seen.add(cid)
+            jobs.append({"client_id": cid, "portfolio": portfolio, **prefs})
+            continue
+        rejected.append({"source": where, "error": error})
+    return jobs, rejected
+
+
+def _write_atomic(path: str, write) -> None:
+    with store_io.atomic_write(path) as tmp:
+        write(tmp)
+
+
+def run_job(job: dict, output_dir: str) -> dict:
+    # Runs in a worker process; the graph (and its provider clients) is
+    # imported here so the parent process stays light.
+    from graph_builder import graph
+    from portfolio_io import read_portfolio
+    import telemetry
+
+    started = time.perf_counter()
+    state = {
+        "user_uploaded_file": job["portfolio"],
+        "holdings": read_portfolio(job["portfolio"]),
+        **{field: job[field] for field in PREFERENCE_FIELDS},
+        "portfolio": [],
+        "summary": [],
+        "final_response": [],
+        "messages": [],
+    }
+    result = graph.invoke(state)
+
+    reports = [{field: stock.get(field) for field in REPORT_FIELDS} for stock in result["portfolio"]]
+    client_dir = os.path.join(output_dir, job["client_id"])
+    os.makedirs(client_dir, exist_ok=True)
+    _write_atomic(
+        os.path.join(client_dir, "reports.parquet"),
+        lambda path: pd.DataFrame(reports, columns=list(REPORT_FIELDS)).to_parquet(path, index=False),
+    )
+
+    def write_result(path):
+        with open(path, "w") as f:
+            json.dump({
+                "client_id": job["client_id"],
+                "portfolio_file": job["portfolio"],
+                "preferences": {field: job[field] for field in PREFERENCE_FIELDS},
+                "summary": result.get("summary"),
+                "suggestions": result.get("suggestions", []),
+                "reports": reports,
+            }, f, indent=2, default=str)
+    _write_atomic(os.path.join(client_dir, RESULT_FILE), write_result)
+    # Cumulative metrics for this worker process (no-op unless enabled)
+    telemetry.flush(os.path.join(output_dir, f"metrics-{os.getpid()}.prom"))
+
+    return {"client_id": job["client_id"], "tickers": len(reports), "seconds": time.perf_counter() - started}
+
+
+def is_done(job: dict, output_dir: str) -> bool:
+    return os.path.exists(os.path.join(output_dir, job["client_id"], RESULT_FILE))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="Directory of portfolio CSVs or a manifest CSV")
+    parser.add_argument("--output", required=True, help="Output directory")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--no-resume", action="store_true", help="Re-run clients that already have results")
+    parser.add_argument("--risk-tolerance", default="Medium", choices=["Low", "Medium", "High"])
+    parser.add_argument("--investment-horizon", default="Medium-term", choices=["Short-term", "Medium-term", "Long-term"])
+    parser.add_argument("--objective", default="Growth")
+    parser.add_argument("--liquidity-needs", default="1–3 years")
+    args = parser.parse_args()
+
+    defaults = {field: getattr(args, field) for field in PREFERENCE_FIELDS}
+    jobs, rejected = load_jobs(args.source, defaults)
+    for entry in rejected:
+        print(f"⚠️ Skipping {entry['source']}: {entry['error']}")
+    pending = jobs if args.no_resume else [job for job in jobs if not is_done(job, args.output)]
+    print(f"{len(jobs)} portfolios, {len(jobs) - len(pending)} already done, {len(pending)} to run on {args.workers} workers")
+    os.makedirs(args.output, exist_ok=True)
+
+    started = time.perf_counter()
+    done, failed = 0, []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(run_job, job, args.output): job for job in pending}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                failed.append({"client_id": job["client_id"], "error": str(e)})
+                print(f"❌ {job['client_id']}: {e}")
+                continue
+            done += 1
+            elapsed = time.perf_counter() - started
+            print(
+                f"✅ {stats['client_id']}: {stats['tickers']} tickers in {stats['seconds']:.1f}s "
+                f"({done}/{len(pending)}, {done / elapsed * 60:.1f} portfolios/min)"
+            )
+
+    elapsed = time.perf_counter() - started
+    throughput = done / elapsed * 60 if elapsed else 0.0
+    with open(os.path.join(args.output, "batch_stats.json"), "w") as f:
+        json.dump({
+            "portfolios": len(jobs),
+            "skipped": len(jobs) - len(pending),
+            "rejected": rejected,
+            "completed": done,
+            "failed": failed,
+            "workers": args.workers,
+            "seconds": round(elapsed, 1),
+            "portfolios_per_minute": round(throughput, 2),
+        }, f, indent=2)
+    print(f"Done: {done} completed, {len(failed)} failed in {elapsed:.1f}s ({throughput:.1f} portfolios/min)")
+    if failed:
+        print("Failed portfolios are retried the next time the batch is run.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Import-time benchmark for `import graph_builder` (Streamlit/worker cold start).
+
+Each sample runs in a fresh interpreter. Run from the repo root:
+    python -m benchmarks.bench_import --runs 5
+    python -m benchmarks.bench_import --save-baseline bench_import.json
+    python -m benchmarks.bench_import --baseline bench_import.json --tolerance 0.2
+
+Exits with status 1 when the median import time exceeds --max-seconds or the
+baseline by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROBE = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def sample(module: str) -> tuple[float, str]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    return float(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def slowest_imports(importtime_log: str, top: int) -> list[tuple[int, str]]:
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith(" ") or name.startswith("  "):
+            continue  # top-level imports only
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="graph_builder")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--save-baseline", default=None)
+    args = parser.parse_args()
+
+    timings, log = [], ""
+    for _ in range(args.runs):
+        seconds, log = sample(args.module)
+        timings.append(seconds)
+    median = statistics.median(timings)
+
+    print(f"import {args.module}: median {median:.3f}s, best {min(timings):.3f}s over {args.runs} runs")
+    print("slowest top-level imports (cumulative):")
+    for micros, name in slowest_imports(log, args.top):
+        print(f"  {micros / 1e6:7.3f}s  {name}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"module": args.module, "median_seconds": median}, f, indent=2)
+
+    failed = False
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"FAIL: median {median:.3f}s exceeds --max-seconds {args.max_seconds:.3f}s")
+        failed = True
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["median_seconds"]
+        limit = baseline * (1 + args.tolerance)
+        print(f"baseline {baseline:.3f}s, limit {limit:.3f}s")
+        if median > limit:
+            print(f"FAIL: median {median:.3f}s regressed past baseline")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Microbenchmark for indicators.compute_indicator_panel.
+
+Run from the repo root:
+    python -m benchmarks.bench_indicators --tickers 500 --days 180
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from indicators import compute_indicator_panel, compute_indicators
+
+
+def synthetic_prices(days: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    spread = np.abs(rng.normal(0, 0.01, days)) * close
+    return pd.DataFrame({
+        "date": pd.bdate_range(end="2025-06-30", periods=days).strftime("%Y-%m-%d"),
+        "open": close + rng.normal(0, 0.5, days),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.integers(1_000_000, 5_000_000, days).astype("float64"),
+    })
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = {f"T{i:05d}": synthetic_prices(args.days, seed=i) for i in range(args.tickers)}
+    one = next(iter(frames.values()))
+
+    batch = best_of(lambda: compute_indicator_panel(frames), args.repeat)
+    single = best_of(lambda: compute_indicators(one), args.repeat)
+
+    print(f"tickers={args.tickers} days={args.days} repeat={args.repeat}")
+    print(f"batch:  {batch * 1000:.1f} ms total, {batch / args.tickers * 1e6:.0f} us/ticker")
+    print(f"single: {single * 1e6:.0f} us/ticker")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark portfolio_io.read_portfolio against the old iterrows loader.
+
+Run from the repo root:
+    python -m benchmarks.bench_load_portfolio --rows 10000 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from portfolio_io import read_portfolio, to_stock_infos
+
+SECTORS = ["Technology", "Energy", "Financials", "Health Care", "Utilities", "Industrials"]
+
+
+def write_synthetic_csv(path: str, rows: int, tickers: int, seed: int = 0) -> None:
+    # Same schema as test.csv; tickers repeat, so lots get aggregated.
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(0, tickers, rows)
+    pd.DataFrame({
+        "Ticker": [f"T{i:05d}" for i in ids],
+        "Company Name": [f"Company {i}" for i in ids],
+        "Shares Held": rng.integers(1, 500, rows),
+        "Buy Price": rng.uniform(5, 500, rows).round(2),
+        "Current Price": (100 + ids % 400).astype(float),
+        "Sector": [SECTORS[i % len(SECTORS)] for i in ids],
+        "Purchase Date": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 1800, rows), unit="D"),
+    }).to_csv(path, index=False, date_format="%Y-%m-%d")
+
+
+def legacy_load(path: str) -> list[dict]:
+    # The previous load_portfolio: one dict with two empty frames per row.
+    df = pd.read_csv(path)
+    return [
+        {
+            "ticker": row["Ticker"], "shares_held": row["Shares Held"], "buy_price": row["Buy Price"],
+            "current_price": row["Current Price"], "sector": row["Sector"], "purchase_date": row["Purchase Date"],
+            "prices": pd.DataFrame(), "news": pd.DataFrame(),
+            "price_analyst_report": "", "news_analyst_report": "", "recommendation": "",
+        }
+        for _, row in df.iterrows()
+    ]
+
+
+def measure(func) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--tickers", type=int, default=2_000)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = os.path.join(tmp, f"portfolio_{rows}.csv")
+            write_synthetic_csv(path, rows, args.tickers)
+
+            seconds, peak_mb = measure(lambda: to_stock_infos(read_portfolio(path)))
+            print(f"rows={rows:>7} vectorized: {seconds * 1000:8.1f} ms, peak {peak_mb:7.1f} MB")
+            if not args.skip_legacy:
+                seconds, peak_mb = measure(lambda: legacy_load(path))
+                print(f"rows={rows:>7} iterrows:   {seconds * 1000:8.1f} ms, peak {peak_mb:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Microbenchmark for risk.compute_portfolio_risk.
+
+Run from the repo root:
+    python -m benchmarks.bench_risk --tickers 1000 --days 180
+"""
+import argparse
+import numpy as np
+from risk import close_matrix, compute_portfolio_risk
+from benchmarks.bench_indicators import synthetic_prices, best_of
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = {f"T{i:05d}": synthetic_prices(args.days, seed=i) for i in range(args.tickers)}
+    values = {ticker: float(v) for ticker, v in zip(frames, rng.lognormal(10, 1, args.tickers))}
+    sectors = {ticker: f"S{i % 11}" for i, ticker in enumerate(frames)}
+    benchmark = synthetic_prices(args.days, seed=-1 % 2**32).set_index("date")["close"]
+
+    align = best_of(lambda: close_matrix(frames), args.repeat)
+    closes = close_matrix(frames)
+    metrics = best_of(lambda: compute_portfolio_risk(closes, values, sectors, benchmark), args.repeat)
+
+    print(f"tickers={args.tickers} days={args.days} repeat={args.repeat}")
+    print(f"align closes: {align * 1000:.1f} ms")
+    print(f"risk metrics: {metrics * 1000:.1f} ms")
+    print(f"total:        {(align + metrics) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Offline stand-ins for the OpenBB, Finnhub and Groq clients.
+
+Each stand-in sleeps for a configurable latency and then replays a recorded
+fixture when one exists, or deterministic synthetic data otherwise:
+    <fixtures>/prices/<TICKER>.parquet   date, open, high, low, close, volume
+    <fixtures>/news/<TICKER>.json        Finnhub company_news list
+Install them with install_fakes() before the graph runs.
+"""
+import os
+import json
+import time
+import zlib
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+import clients
+
+SOURCES = ["Reuters", "Bloomberg", "CNBC", "MarketWatch", "Yahoo", "Seeking Alpha"]
+REPLY = (
+    "Hold. The price trend is range-bound with moderate volatility and the recent news flow "
+    "is mixed, so the position fits a balanced profile without changes."
+)
+
+
+def _seed(symbol: str) -> int:
+    return zlib.crc32(symbol.encode("utf-8"))
+
+
+def synthetic_prices(symbol: str, start: str, end: str) -> pd.DataFrame:
+    days = pd.bdate_range(start, end)
+    if not len(days):
+        return pd.DataFrame(columns=["date", "open", "high", "low", "close", "volume"])
+    rng = np.random.default_rng(_seed(symbol))
+    # Walk from a fixed origin so overlapping windows agree on closes
+    origin = pd.bdate_range("2000-01-03", end)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(origin))))[-len(days):]
+    spread = np.abs(rng.normal(0, 0.01, len(days))) * close
+    return pd.DataFrame({
+        "date": days,
+        "open": close + rng.normal(0, 0.5, len(days)),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.integers(1_000_000, 5_000_000, len(days)).astype("float64"),
+    })
+
+
+def synthetic_news(symbol: str, start: str, end: str, per_day: int = 3) -> list[dict]:
+    rng = np.random.default_rng(_seed(symbol) + 1)
+    articles = []
+    for day in pd.date_range(start, end):
+        for i in range(per_day):
+            stamp = int((day + pd.Timedelta(hours=9 + 3 * i)).timestamp())
+            articles.append({
+                "datetime": stamp,
+                "headline": f"{symbol} {['beats', 'misses', 'holds', 'raises', 'cuts'][rng.integers(5)]} "
+                            f"guidance as sector {['rallies', 'slides', 'steadies'][rng.integers(3)]}",
+                "source": SOURCES[rng.integers(len(SOURCES))],
+                "url": f"https://news.example/{symbol}/{stamp}/{i}",
+            })
+    return articles
+
+
+class _Result:
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+
+    def to_df(self) -> pd.DataFrame:
+        return self._df
+
+
+class FakeOpenBB:
+    def __init__(self, latency: float = 0.05, fixtures: str | None = None):
+        self.latency = latency
+        self.fixtures = fixtures
+        self.equity = SimpleNamespace(price=SimpleNamespace(historical=self._historical))
+        self.stocks = SimpleNamespace(screener=self._screener, news=self._news)
+
+    def _prices(self, symbol: str, start: str, end: str) -> pd.DataFrame:
+        path = os.path.join(self.fixtures or "", "prices", f"{symbol}.parquet")
+        if self.fixtures and os.path.exists(path):
+            df = pd.read_parquet(path)
+            dates = pd.to_datetime(df["date"])
+            return df[(dates >= start) & (dates <= end)].assign(date=dates)
+        return synthetic_prices(symbol, start, end)
+
+    def _historical(self, symbol: str, start_date: str, end_date: str, interval: str = "1d"):
+        # Like OpenBB: indexed by date, with a symbol column for several symbols
+        time.sleep(self.latency)
+        symbols = symbol.split(",")
+        frames = [self._prices(s, start_date, end_date).assign(symbol=s) for s in symbols]
+        df = pd.concat(frames, ignore_index=True).set_index("date")
+        return _Result(df if len(symbols) > 1 else df.drop(columns="symbol"))
+
+    def _screener(self, limit: int = 20, filters=None) -> pd.DataFrame:
+        time.sleep(self.latency)
+        return pd.DataFrame({"symbol": [f"SCR{i:03d}" for i in range(limit)]})
+
+    def _news(self, ticker: str) -> pd.DataFrame:
+        time.sleep(self.latency)
+        return pd.DataFrame({"title": [f"{ticker} headline {i}" for i in range(3)]})
+
+
+class FakeFinnhub:
+    def __init__(self, latency: float = 0.05, fixtures: str | None = None):
+        self.latency = latency
+        self.fixtures = fixtures
+
+    def company_news(self, ticker: str, _from: str, to: str) -> list[dict]:
+        time.sleep(self.latency)
+        path = os.path.join(self.fixtures or "", "news", f"{ticker}.json")
+        if self.fixtures and os.path.exists(path):
+            with open(path) as f:
+                articles = json.load(f)
+            lo = pd.Timestamp(_from).timestamp()
+            hi = (pd.Timestamp(to) + pd.Timedelta(days=1)).timestamp()
+            return [a for a in articles if lo <= a["datetime"] < hi]
+        return synthetic_news(ticker, _from, to)
+
+
+class SlowFakeChatModel(FakeListChatModel):
+    # FakeListChatModel with a per-call latency and the attributes the LLM
+    # cache key reads.
+    latency: float = 0.0
+    model_name: str = "fake-chat"
+    temperature: float = 0.0
+
+    def _call(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return super()._call(*args, **kwargs)
+
+
+def install_fakes(price_latency: float, news_latency: float, llm_latency: float,
+                  fixtures: str | None = None, temperatures=(0.0, 0.35)) -> None:
+    clients.install("openbb", FakeOpenBB(price_latency, fixtures))
+    clients.install("finnhub", FakeFinnhub(news_latency, fixtures))
+    for temperature in temperatures:
+        clients.install(("groq", temperature), SlowFakeChatModel(
+            responses=[REPLY], latency=llm_latency, temperature=temperature,
+        ))
@@ -0,0 +1,181 @@
+"""End-to-end offline benchmark of the compiled graph at several book sizes.
+
+Providers are replaced by the stand-ins in benchmarks/fakes.py, so no
+network or API keys are needed. Each sample runs in a fresh interpreter
+with an empty cache directory (cold caches, clean peak RSS). Run from the
+repo root:
+    python -m benchmarks.harness --sizes 5 50 500 5000 --runs 3
+    python -m benchmarks.harness --save-baseline bench_harness.json
+    python -m benchmarks.harness --baseline bench_harness.json --tolerance 0.2
+
+Reports p50/p95 wall time, tickers per second, peak RSS and a per-node
+breakdown for every size. Exits with status 1 when a size's p50 regresses
+past the baseline by more than the tolerance.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECTORS = ["Technology", "Energy", "Financials", "Health Care", "Utilities", "Industrials"]
+
+
+def synthetic_portfolio(tickers: int, seed: int = 0):
+    # One lot per ticker, in the test.csv schema
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Ticker": [f"T{i:05d}" for i in range(tickers)],
+        "Company Name": [f"Company {i}" for i in range(tickers)],
+        "Shares Held": rng.integers(1, 500, tickers).astype("float64"),
+        "Buy Price": rng.uniform(5, 500, tickers).round(2),
+        "Current Price": rng.uniform(5, 500, tickers).round(2),
+        "Sector": [SECTORS[i % len(SECTORS)] for i in range(tickers)],
+        "Purchase Date": "2023-06-15",
+    })
+
+
+def run_sample(args) -> dict:
+    # Worker side: one graph run in this interpreter, printed as JSON.
+    import resource
+    from benchmarks.fakes import install_fakes
+    from nodes import SUMMARY_TEMPERATURE
+    install_fakes(args.price_latency, args.news_latency, args.llm_latency, args.fixtures,
+                  temperatures=(0.0, SUMMARY_TEMPERATURE))
+    from graph_builder import graph
+    from portfolio_io import read_portfolio
+    import telemetry
+
+    state = {
+        "user_uploaded_file": "synthetic.csv",
+        "holdings": read_portfolio(synthetic_portfolio(args.tickers)),
+        "risk_tolerance": "Medium",
+        "investment_horizon": "Medium-term",
+        "objective": "Growth",
+        "liquidity_needs": "1–3 years",
+        "portfolio": [],
+        "summary": [],
+        "final_response": [],
+        "messages": [],
+    }
+    started = time.perf_counter()
+    result = graph.invoke(state)
+    seconds = time.perf_counter() - started
+
+    nodes = {}
+    for row in telemetry.snapshot()["histograms"].get("node_seconds", []):
+        node = row["labels"]["node"]
+        calls, total = nodes.get(node, (0, 0.0))
+        nodes[node] = (calls + row["count"], total + row["sum"])
+    return {
+        "tickers": args.tickers,
+        "analyzed": len(result["portfolio"]),
+        "seconds": seconds,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # KiB on Linux
+        "nodes": {node: {"calls": calls, "seconds": total} for node, (calls, total) in nodes.items()},
+    }
+
+
+def sample(args, tickers: int) -> dict:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {
+            **os.environ,
+            "PORTFOLIO_CACHE_DIR": cache_dir,
+            "TELEMETRY_ENABLED": "1",
+            "TELEMETRY_LOG_PATH": os.devnull,
+            # Quotas are for real providers; the stand-ins are unmetered
+            "OPENBB_REQUESTS_PER_MINUTE": "0",
+            "FINNHUB_REQUESTS_PER_MINUTE": "0",
+            "GROQ_REQUESTS_PER_MINUTE": "0",
+            "LLM_TOKENS_PER_MINUTE": "0",
+            "RISK_BENCHMARK_TICKER": "BENCH",
+        }
+        command = [
+            sys.executable, "-m", "benchmarks.harness", "--worker", "--tickers", str(tickers),
+            "--price-latency", str(args.price_latency), "--news-latency", str(args.news_latency),
+            "--llm-latency", str(args.llm_latency),
+        ] + (["--fixtures", args.fixtures] if args.fixtures else [])
+        proc = subprocess.run(command, cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"Sample with {tickers} tickers failed:\n{proc.stderr[-4000:]}")
+    # The graph prints progress; the result is the last stdout line
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples: list[dict]) -> dict:
+    seconds = np.array([s["seconds"] for s in samples])
+    p50 = float(np.percentile(seconds, 50))
+    nodes = {}
+    for s in samples:
+        for node, stats in s["nodes"].items():
+            calls, total = nodes.get(node, (0, 0.0))
+            nodes[node] = (calls + stats["calls"], total + stats["seconds"])
+    return {
+        "runs": len(samples),
+        "p50": p50,
+        "p95": float(np.percentile(seconds, 95)),
+        "tickers_per_second": samples[0]["tickers"] / p50 if p50 else 0.0,
+        "peak_rss_mb": max(s["peak_rss_mb"] for s in samples),
+        "nodes": {
+            node: {"calls": calls / len(samples), "seconds": total / len(samples)}
+            for node, (calls, total) in sorted(nodes.items(), key=lambda kv: -kv[1][1])
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 500, 5000])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--price-latency", type=float, default=0.05, help="Seconds per OpenBB call")
+    parser.add_argument("--news-latency", type=float, default=0.05, help="Seconds per Finnhub call")
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="Seconds per LLM call")
+    parser.add_argument("--fixtures", default=None, help="Directory of recorded prices/ and news/ fixtures")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--save-baseline", default=None)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--tickers", type=int, default=5, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_sample(args)))
+        return
+
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = summarize([sample(args, size) for _ in range(args.runs)])
+        r = results[str(size)]
+        print(
+            f"tickers={size:>5}  p50 {r['p50']:8.2f}s  p95 {r['p95']:8.2f}s  "
+            f"{r['tickers_per_second']:8.1f} tickers/s  peak RSS {r['peak_rss_mb']:7.1f} MB"
+        )
+        for node, stats in r["nodes"].items():
+            print(f"    {node:<22} {stats['calls']:>7.0f} calls  {stats['seconds']:9.2f}s total")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            settings = {key: getattr(args, key) for key in ("runs", "price_latency", "news_latency", "llm_latency")}
+            json.dump({"settings": settings, "sizes": results}, f, indent=2)
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["sizes"]
+        for size, r in results.items():
+            if size not in baseline:
+                continue
+            limit = baseline[size]["p50"] * (1 + args.tolerance)
+            status = "FAIL" if r["p50"] > limit else "ok"
+            print(f"{status}: tickers={size} p50 {r['p50']:.2f}s vs baseline {baseline[size]['p50']:.2f}s (limit {limit:.2f}s)")
+            failed = failed or status == "FAIL"
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
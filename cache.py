@@ -0,0 +1,99 @@
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+
+# Small disk-backed key/value cache on SQLite with TTL expiry, an LRU size
+# cap and hit/miss counters. Values are pickled, so any picklable object
+# (LLM responses, DataFrames) can be stored. SQLite's own locking makes the
+# file safe to share between processes; a lock serializes threads.
+
+
+def content_key(*parts) -> str:
+    # Content address for a tuple of values, e.g. (model, temperature, prompt).
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class DiskCache:
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened lazily so that importing a module that defines a cache never
+        # touches the disk.
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        return self._conn
+
+    def get(self, key: str, default=None):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return default
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, key: str, value) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until back under the cap
+        excess = total - self.max_bytes
+        freed = 0
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM entries")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,56 @@
+import os
+import threading
+import config  # loads .env before any credentials are read
+
+# Shared, lazily created provider clients. Importing this module is cheap:
+# openbb, finnhub and langchain_groq are only imported the first time the
+# corresponding client is requested, and each client is then reused by
+# every module and thread in the process.
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def _get_or_create(name, factory):
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = factory()
+    return client
+
+
+def get_llm(temperature: float = 0.0):
+    def create():
+        from langchain_groq import ChatGroq
+        return ChatGroq(
+            temperature=temperature,
+            model_name=config.LLM_MODEL,
+            api_key=os.environ.get("GROQ_API_KEY"),
+            max_retries=0,  # retries and backoff are handled by providers.call
+        )
+    return _get_or_create(("groq", temperature), create)
+
+
+def get_finnhub_client():
+    def create():
+        import finnhub
+        return finnhub.Client(api_key=os.getenv("FINNHUB_API_KEY"))
+    return _get_or_create("finnhub", create)
+
+
+def get_obb():
+    def create():
+        from openbb import obb
+        # Login (only needs to be done once per session)
+        # obb.login("OPENBB_API_KEY")
+        return obb
+    return _get_or_create("openbb", create)
+
+
+def install(key, client) -> None:
+    # Pre-register a client under its registry key ("openbb", "finnhub" or
+    # ("groq", temperature)), e.g. a local stand-in for offline benchmarks.
+    with _lock:
+        _clients[key] = client
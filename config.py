@@ -0,0 +1,128 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _int_env(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+# Max in-flight requests per data provider. Applies to the node-level thread
+# pools and to every direct call into the provider, so the limits hold no
+# matter how many callers are fetching at once.
+OPENBB_MAX_CONCURRENCY = _int_env("OPENBB_MAX_CONCURRENCY", 8)
+FINNHUB_MAX_CONCURRENCY = _int_env("FINNHUB_MAX_CONCURRENCY", 4)
+
+# Per-minute request quotas (0 = unlimited), shared by every thread and
+# process through providers.py. Failed requests with 429/5xx are retried
+# with jittered exponential backoff; after PROVIDER_BREAKER_FAILURES
+# consecutive failures a provider is skipped for the cooldown.
+OPENBB_REQUESTS_PER_MINUTE = _int_env("OPENBB_REQUESTS_PER_MINUTE", 0)
+FINNHUB_REQUESTS_PER_MINUTE = _int_env("FINNHUB_REQUESTS_PER_MINUTE", 60)
+GROQ_REQUESTS_PER_MINUTE = _int_env("GROQ_REQUESTS_PER_MINUTE", 30)
+PROVIDER_MAX_RETRIES = _int_env("PROVIDER_MAX_RETRIES", 4)
+PROVIDER_BACKOFF_SECONDS = _int_env("PROVIDER_BACKOFF_SECONDS", 1)
+PROVIDER_BREAKER_FAILURES = _int_env("PROVIDER_BREAKER_FAILURES", 5)
+PROVIDER_BREAKER_COOLDOWN_SECONDS = _int_env("PROVIDER_BREAKER_COOLDOWN_SECONDS", 30)
+
+# Max per-ticker pipelines the graph runs at once (the fan-out width).
+TICKER_MAX_CONCURRENCY = _int_env("TICKER_MAX_CONCURRENCY", 16)
+
+# Root directory for the local market-data stores and caches.
+CACHE_DIR = os.getenv("PORTFOLIO_CACHE_DIR", ".cache")
+
+# A stored price window that ended on the (possibly still open) day it was
+# fetched is refreshed once it is older than this.
+PRICE_STORE_MAX_AGE_MINUTES = _int_env("PRICE_STORE_MAX_AGE_MINUTES", 60)
+
+# Symbols per multi-symbol OpenBB price request when downloading a book.
+PRICE_BULK_CHUNK = _int_env("PRICE_BULK_CHUNK", 50)
+
+# Screener results (with headlines) are cached per filter set for this long;
+# suggest_stocks never waits longer than the deadline for a cold screen.
+SCREENER_CACHE_TTL_MINUTES = _int_env("SCREENER_CACHE_TTL_MINUTES", 360)
+SUGGESTIONS_DEADLINE_SECONDS = _int_env("SUGGESTIONS_DEADLINE_SECONDS", 15)
+
+# Today's news is re-requested once the cached copy is older than this; past
+# days are only ever fetched once. Articles older than the retention window
+# are dropped from the cache.
+NEWS_STORE_MAX_AGE_MINUTES = _int_env("NEWS_STORE_MAX_AGE_MINUTES", 15)
+NEWS_STORE_RETENTION_DAYS = _int_env("NEWS_STORE_RETENTION_DAYS", 30)
+
+# Headlines at least this similar (Jaccard over character shingles, in
+# percent) are one story; 0 turns news clustering off (news_dedup.py).
+NEWS_DEDUP_SIMILARITY = _int_env("NEWS_DEDUP_SIMILARITY", 50)
+
+# Local sentiment screen (sentiment.py), in percent of the -1..+1 score:
+# only tickers whose news is at least this strong, mixed, trending or moved
+# by half this much since the last run get an LLM news analysis; the rest
+# get a templated report. 0 sends every ticker to the LLM.
+SENTIMENT_ESCALATION_THRESHOLD = _int_env("SENTIMENT_ESCALATION_THRESHOLD", 35)
+
+# Estimated-token budgets for the price table and headline list embedded in
+# the analysis prompts (see serialization.py).
+PRICE_PROMPT_TOKEN_BUDGET = _int_env("PRICE_PROMPT_TOKEN_BUDGET", 600)
+NEWS_PROMPT_TOKEN_BUDGET = _int_env("NEWS_PROMPT_TOKEN_BUDGET", 800)
+
+# LLM response cache: entries expire after the TTL and the least recently
+# used ones are evicted once the file exceeds the size cap.
+LLM_CACHE_TTL_HOURS = _int_env("LLM_CACHE_TTL_HOURS", 24)
+LLM_CACHE_MAX_MB = _int_env("LLM_CACHE_MAX_MB", 256)
+
+# LLM calls: max requests in flight, and an optional cap on estimated
+# prompt tokens sent per minute by all runs and workers (0 disables it).
+LLM_MAX_CONCURRENCY = _int_env("LLM_MAX_CONCURRENCY", 8)
+LLM_TOKENS_PER_MINUTE = _int_env("LLM_TOKENS_PER_MINUTE", 0)
+
+# Groq model used by every chain
+LLM_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+
+# Shared ticker-day analyst reports (artifacts.py): kept for the retention
+# window and capped in size.
+ARTIFACT_RETENTION_DAYS = _int_env("ARTIFACT_RETENTION_DAYS", 7)
+ARTIFACT_STORE_MAX_MB = _int_env("ARTIFACT_STORE_MAX_MB", 256)
+
+# Node memoization (memo.py): set NODE_MEMO_ENABLED=0 to always recompute.
+NODE_MEMO_ENABLED = _int_env("NODE_MEMO_ENABLED", 1)
+NODE_MEMO_TTL_HOURS = _int_env("NODE_MEMO_TTL_HOURS", 72)
+NODE_MEMO_MAX_MB = _int_env("NODE_MEMO_MAX_MB", 512)
+
+# Rows per chunk when reading portfolio CSVs; lots are aggregated per chunk.
+PORTFOLIO_CHUNK_ROWS = _int_env("PORTFOLIO_CHUNK_ROWS", 50_000)
+
+# Keep fetched prices and news in one long-format panel for the whole book
+# (AppState.panel) instead of two DataFrames per StockInfo.
+PANEL_STATE = _int_env("PANEL_STATE", 0)
+
+# Benchmark for portfolio beta in the summary's risk metrics (risk.py);
+# set to an empty string to skip the extra price fetch.
+RISK_BENCHMARK_TICKER = os.getenv("RISK_BENCHMARK_TICKER", "SPY")
+
+# Worker processes for batch_runner.py (one portfolio per process at a time).
+# Provider quotas are shared across them; concurrency caps are per process.
+BATCH_WORKERS = _int_env("BATCH_WORKERS", os.cpu_count() or 4)
+
+# Level of the application log on stderr (telemetry.log): DEBUG adds
+# per-ticker progress, INFO shows one line per stage, WARNING only problems.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Telemetry (telemetry.py): per-node/per-ticker timings, provider metrics,
+# LLM token counts and cache hit rates as JSON log lines (stderr unless a
+# log path is set) and a Prometheus text dump. Off by default.
+TELEMETRY_ENABLED = _int_env("TELEMETRY_ENABLED", 0)
+TELEMETRY_LOG_PATH = os.getenv("TELEMETRY_LOG_PATH", "")
+TELEMETRY_METRICS_PATH = os.getenv("TELEMETRY_METRICS_PATH", os.path.join(CACHE_DIR, "metrics.prom"))
+
+# Background pre-warming (prewarm.py). The watchlist is every ticker seen in
+# an uploaded portfolio within the retention window plus WATCHLIST_TICKERS
+# (comma-separated). Market data and analyst reports are refreshed every
+# PREWARM_INTERVAL_MINUTES while the US market is open (0 = only after the
+# close) and once after the close, in chunks paced to use at most
+# PREWARM_QUOTA_SHARE percent of the Finnhub and Groq per-minute quotas.
+WATCHLIST_TICKERS = [t.strip().upper() for t in os.getenv("WATCHLIST_TICKERS", "").split(",") if t.strip()]
+WATCHLIST_RETENTION_DAYS = _int_env("WATCHLIST_RETENTION_DAYS", 14)
+PREWARM_INTERVAL_MINUTES = _int_env("PREWARM_INTERVAL_MINUTES", 120)
+PREWARM_CHUNK = _int_env("PREWARM_CHUNK", 25)
+PREWARM_QUOTA_SHARE = _int_env("PREWARM_QUOTA_SHARE", 50)
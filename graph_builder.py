@@ -1,48 +1,168 @@
-from langgraph.graph import StateGraph
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
 # from typing import TypedDict, Annotated
 # import operator
 from langchain_core.messages import AnyMessage
-from state import AppState
+from state import AppState, TickerState
+from config import TICKER_MAX_CONCURRENCY, PANEL_STATE
+from panel import PortfolioPanel, stock_prices
+from memo import memoize_node, trading_date, file_digest
+from telemetry import traced_node
 
 from nodes import (
     load_portfolio,
-    price_history_node,
-    news_fetch_node,
-    price_analysis_node,
-    news_analysis_node,
-    suggest_stocks_node,
+    prefetch_node,
+    preferences,
     stock_advice_node,
+    suggest_stocks_node,
     summarize_node,
+    ticker_price_history_node,
+    ticker_news_fetch_node,
+    ticker_price_analysis_node,
+    ticker_news_analysis_node,
+    ticker_advice_node,
 )
 
-# 1. Initialize the graph
+# 0. Memoization keys: everything each node reads, so a node is skipped
+#    exactly when those inputs are unchanged (see memo.py). Fetch nodes
+#    read through the local stores instead. Every node is also wrapped in
+#    traced_node, a no-op unless TELEMETRY_ENABLED.
+HOLDING_FIELDS = ("ticker", "shares_held", "buy_price", "current_price", "sector", "purchase_date")
+
+
+def _holding(stock) -> tuple:
+    return tuple(stock[field] for field in HOLDING_FIELDS)
+
+
+def _load_inputs(state):
+    holdings = state.get("holdings")
+    return holdings if holdings is not None else file_digest(state["user_uploaded_file"])
+
+
+def _advice_inputs(state):
+    reports = [(s["ticker"], s["price_analyst_report"], s["news_analyst_report"]) for s in state["portfolio"]]
+    return reports, preferences(state)
+
+
+def _summary_inputs(state):
+    # Prices feed the risk metrics; the trading date covers the benchmark.
+    stocks = [(_holding(s), s.get("recommendation"), stock_prices(state, s)) for s in state["portfolio"]]
+    return stocks, preferences(state), state.get("suggestions"), trading_date()
+
+
+# 1. Per-ticker subgraph: the price and news branches run in parallel and
+#    join at the adviser.
+#
+#    price_history -> price_analyzer --\
+#                                       +--> stock_adviser
+#    news_fetcher  -> news_analyzer  --/
+ticker_builder = StateGraph(TickerState)
+
+# The fetchers are not memoized: the price and news stores already serve
+# them from disk and refresh today's data on their own schedule.
+ticker_builder.add_node("price_history", traced_node("price_history", ticker_price_history_node))
+ticker_builder.add_node("news_fetcher", traced_node("news_fetcher", ticker_news_fetch_node))
+ticker_builder.add_node("price_analyzer", traced_node("price_analyzer", memoize_node(
+    "price_analyzer", ticker_price_analysis_node,
+    lambda s: (s["stock"]["ticker"], s["prices"]),
+)))
+ticker_builder.add_node("news_analyzer", traced_node("news_analyzer", memoize_node(
+    "news_analyzer", ticker_news_analysis_node,
+    lambda s: (s["stock"]["ticker"], s["news"], s.get("local_news_report", "")),
+)))
+ticker_builder.add_node("stock_adviser", traced_node("ticker_stock_adviser", memoize_node(
+    "ticker_stock_adviser", ticker_advice_node,
+    lambda s: (s["stock"]["ticker"], s["price_analyst_report"], s["news_analyst_report"], preferences(s)),
+)))
+
+ticker_builder.add_edge(START, "price_history")
+ticker_builder.add_edge(START, "news_fetcher")
+ticker_builder.add_edge("price_history", "price_analyzer")
+ticker_builder.add_edge("news_fetcher", "news_analyzer")
+ticker_builder.add_edge(["price_analyzer", "news_analyzer"], "stock_adviser")
+ticker_builder.add_edge("stock_adviser", END)
+
+ticker_graph = ticker_builder.compile()
+
+
+def ticker_pipeline(state: TickerState) -> dict:
+    # Run one holding through the subgraph and hand back only its own stock,
+    # tagged with its position; AppState.portfolio's reducer merges it into
+    # place.
+    result = ticker_graph.invoke(state)
+    stock = {
+        **result["stock"],
+        "position": state["position"],
+        "price_analyst_report": result["price_analyst_report"],
+        "news_analyst_report": result["news_analyst_report"],
+        "recommendation": result["recommendation"],
+    }
+    if PANEL_STATE:
+        panel = PortfolioPanel.from_frames(stock["ticker"], result["prices"], result["news"])
+        return {"portfolio": [stock], "panel": panel}
+
+    stock["prices"] = result["prices"]
+    stock["news"] = result["news"]
+    return {"portfolio": [stock]}
+
+
+def fan_out_tickers(state: AppState) -> list[Send]:
+    prefs = preferences(state)
+    screened = state.get("news_screen") or {}
+    return [
+        Send("ticker_pipeline", {
+            "stock": stock, "position": position,
+            "local_news_report": screened.get(stock["ticker"], ""), **prefs,
+        })
+        for position, stock in enumerate(state["portfolio"])
+    ]
+
+
+# 2. Initialize the graph
 builder = StateGraph(AppState)
 
-# 2. Add each node (these names are string references to actual functions)
-builder.add_node("load_portfolio", load_portfolio)
-builder.add_node("price_history", price_history_node)
-builder.add_node("news_fetcher", news_fetch_node)
-builder.add_node("price_analyzer", price_analysis_node)
-builder.add_node("news_analyzer", news_analysis_node)
-builder.add_node("suggest_stocks", suggest_stocks_node)
-builder.add_node("stock_adviser", stock_advice_node)
-builder.add_node("portfolio_summary", summarize_node)
+# 3. Add each node (these names are string references to actual functions)
+builder.add_node("load_portfolio", traced_node("load_portfolio", memoize_node("load_portfolio", load_portfolio, _load_inputs)))
+builder.add_node("prefetch", traced_node("prefetch", prefetch_node))
+builder.add_node("ticker_pipeline", traced_node("ticker_pipeline", ticker_pipeline))
+# suggest_stocks is not memoized: its screener cache already makes a warm run one lookup
+builder.add_node("suggest_stocks", traced_node("suggest_stocks", suggest_stocks_node))
+builder.add_node("portfolio_summary", traced_node("portfolio_summary", memoize_node("portfolio_summary", summarize_node, _summary_inputs)))
 # builder.add_node("final_response", final_response_node)
 
 
-# 3. Define the edges (transitions between nodes)
+# 4. Define the edges: after loading, prices for the whole book are
+#    downloaded in bulk and its news fetched and sentiment-screened in one
+#    pass while the screener runs, then every ticker gets its own pipeline.
+#    The summary is a join: it runs once, after every ticker pipeline and
+#    the screener have finished.
 builder.set_entry_point("load_portfolio")
 
-builder.add_edge("load_portfolio", "price_history")
-builder.add_edge("price_history", "news_fetcher")
-builder.add_edge("news_fetcher", "price_analyzer")
-builder.add_edge("price_analyzer", "news_analyzer")
-builder.add_edge("news_analyzer", "stock_adviser")
-builder.add_edge("stock_adviser", "suggest_stocks")
-builder.add_edge("suggest_stocks", "portfolio_summary")
+builder.add_edge("load_portfolio", "prefetch")
+builder.add_conditional_edges("prefetch", fan_out_tickers, ["ticker_pipeline"])
+builder.add_edge("load_portfolio", "suggest_stocks")
+builder.add_edge(["ticker_pipeline", "suggest_stocks"], "portfolio_summary")
 # builder.add_edge("portfolio_summary", "final_response")
 
 builder.set_finish_point("portfolio_summary")
 
-# 4. Build the graph
-graph = builder.compile()
\ No newline at end of file
+# 5. Build the graph
+graph = builder.compile().with_config({"max_concurrency": TICKER_MAX_CONCURRENCY})
+
+
+# 6. Preference-only graph: re-advises an already fetched and analyzed
+#    portfolio (state["portfolio"] carries prices, news and analyst reports)
+#    when only risk tolerance, horizon, objective or liquidity needs change.
+advice_builder = StateGraph(AppState)
+
+advice_builder.add_node("stock_adviser", traced_node("stock_adviser", memoize_node("stock_adviser", stock_advice_node, _advice_inputs)))
+advice_builder.add_node("suggest_stocks", traced_node("suggest_stocks", suggest_stocks_node))
+advice_builder.add_node("portfolio_summary", traced_node("portfolio_summary", memoize_node("portfolio_summary", summarize_node, _summary_inputs)))
+
+advice_builder.add_edge(START, "stock_adviser")
+advice_builder.add_edge(START, "suggest_stocks")
+advice_builder.add_edge("stock_adviser", "portfolio_summary")
+advice_builder.add_edge("suggest_stocks", "portfolio_summary")
+advice_builder.add_edge("portfolio_summary", END)
+
+advice_graph = advice_builder.compile()
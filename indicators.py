@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+# Deterministic technical indicators computed from the daily OHLCV frames
+# returned by utils.get_price_history. Every ticker in a batch is processed
+# in the same vectorized pass over one long (ticker, date) frame, and only
+# the latest value of each feature is kept for the prompt.
+
+TRADING_DAYS = 252
+SMA_WINDOWS = (10, 20, 50)
+ATR_WINDOW = 14
+VOLATILITY_WINDOW = 20
+VOLUME_WINDOW = 20
+SUPPORT_WINDOW = 20
+VOLUME_SURGE_Z = 2.0
+
+
+def _rolling(grouped, window: int, how: str) -> pd.Series:
+    # Per-ticker rolling aggregate, realigned to the panel's row order.
+    rolled = getattr(grouped.rolling(window, min_periods=window), how)()
+    return rolled.reset_index(level=0, drop=True)
+
+
+def compute_indicator_panel(frames: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    '''
+    # Compute the indicator features for many tickers at once.
+
+    # Args:
+    #     frames (dict[str, pd.DataFrame]): Ticker -> frame with date, open,
+    #         high, low, close, volume. Empty frames are skipped.
+
+    # Returns:
+    #     pd.DataFrame: One row per ticker, indexed by ticker.
+    '''
+    frames = {ticker: df for ticker, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        return pd.DataFrame()
+
+    panel = pd.concat(frames, names=["ticker", None]).reset_index(level=0)
+    panel = panel.sort_values(["ticker", "date"], ignore_index=True)
+    for col in ("open", "high", "low", "close", "volume"):
+        panel[col] = panel[col].astype("float64")
+
+    by_ticker = panel.groupby("ticker", sort=False)
+    close = panel["close"]
+
+    for window in SMA_WINDOWS:
+        panel[f"sma_{window}"] = _rolling(by_ticker["close"], window, "mean")
+
+    # Crossovers of the 20-day over the 50-day average
+    spread_sign = np.sign(panel["sma_20"] - panel["sma_50"])
+    prev_sign = spread_sign.groupby(panel["ticker"], sort=False).shift(1)
+    panel["cross"] = np.where((spread_sign > 0) & (prev_sign < 0), 1, np.where((spread_sign < 0) & (prev_sign > 0), -1, 0))
+
+    # Average true range
+    prev_close = by_ticker["close"].shift(1)
+    true_range = np.fmax(
+        panel["high"] - panel["low"],
+        np.fmax((panel["high"] - prev_close).abs(), (panel["low"] - prev_close).abs()),
+    )
+    panel["atr"] = _rolling(true_range.groupby(panel["ticker"], sort=False), ATR_WINDOW, "mean")
+
+    # Annualized rolling volatility of log returns
+    log_ret = np.log(close / prev_close)
+    panel["volatility"] = _rolling(log_ret.groupby(panel["ticker"], sort=False), VOLATILITY_WINDOW, "std") * np.sqrt(TRADING_DAYS)
+
+    # Volume z-score against the trailing window
+    vol_mean = _rolling(by_ticker["volume"], VOLUME_WINDOW, "mean")
+    vol_std = _rolling(by_ticker["volume"], VOLUME_WINDOW, "std")
+    panel["volume_z"] = (panel["volume"] - vol_mean) / vol_std.replace(0.0, np.nan)
+    panel["volume_surge"] = (panel["volume_z"] > VOLUME_SURGE_Z).astype("int64")
+    panel["recent_surges"] = _rolling(panel.groupby("ticker", sort=False)["volume_surge"], VOLUME_WINDOW, "sum")
+
+    # Support / resistance over the trailing window
+    panel["support"] = _rolling(by_ticker["low"], SUPPORT_WINDOW, "min")
+    panel["resistance"] = _rolling(by_ticker["high"], SUPPORT_WINDOW, "max")
+
+    # Drawdown from the running peak
+    running_max = by_ticker["close"].cummax()
+    panel["drawdown"] = close / running_max - 1.0
+
+    # Momentum
+    panel["return_5d"] = by_ticker["close"].pct_change(5)
+    panel["return_21d"] = by_ticker["close"].pct_change(21)
+
+    latest = panel.groupby("ticker", sort=False).tail(1).set_index("ticker")
+    features = latest[
+        ["date", "close", "sma_10", "sma_20", "sma_50", "atr", "volatility", "volume_z",
+         "recent_surges", "support", "resistance", "drawdown", "return_5d", "return_21d"]
+    ].rename(columns={"date": "last_date", "close": "last_close", "drawdown": "current_drawdown"})
+
+    for window in SMA_WINDOWS:
+        features[f"vs_sma_{window}"] = features["last_close"] / features[f"sma_{window}"] - 1.0
+    features["atr_pct"] = features["atr"] / features["last_close"]
+
+    by_ticker = panel.groupby("ticker", sort=False)
+    first_close = by_ticker["close"].first()
+    features["return_window"] = features["last_close"] / first_close - 1.0
+    features["max_drawdown"] = by_ticker["drawdown"].min()
+    features["window_days"] = by_ticker.size()
+
+    high_idx = by_ticker["close"].idxmax()
+    low_idx = by_ticker["close"].idxmin()
+    for label, idx in (("highest", high_idx), ("lowest", low_idx)):
+        rows = panel.loc[idx.to_numpy(), ["close", "date"]].set_axis(idx.index)
+        features[f"{label}_close"] = rows["close"]
+        features[f"{label}_close_date"] = rows["date"]
+
+    crosses = panel.loc[panel["cross"] != 0, ["ticker", "date", "cross"]]
+    last_cross = crosses.groupby("ticker", sort=False).tail(1).set_index("ticker")
+    features["last_cross"] = last_cross["cross"].map({1: "golden", -1: "death"})
+    features["last_cross_date"] = last_cross["date"]
+
+    return features
+
+
+def compute_indicators(prices: pd.DataFrame) -> dict:
+    # Single-ticker convenience wrapper around compute_indicator_panel.
+    panel = compute_indicator_panel({"_": prices})
+    if panel.empty:
+        return {}
+    return panel.iloc[0].to_dict()
+
+
+def _pct(value) -> str:
+    return "n/a" if pd.isna(value) else f"{value * 100:+.1f}%"
+
+
+def _num(value, digits: int = 2) -> str:
+    return "n/a" if pd.isna(value) else f"{value:.{digits}f}"
+
+
+def format_indicator_block(features: dict) -> str:
+    '''
+    # Render one ticker's features as a compact text block for a prompt.
+    '''
+    if not features:
+        return "No indicator data available"
+
+    if pd.isna(features.get("last_cross")):
+        cross = "no 20/50-day crossover in window"
+    else:
+        cross = f"{features['last_cross']} cross (20d over 50d) on {features['last_cross_date']}"
+
+    lines = [
+        f"window: {int(features['window_days'])} sessions to {features['last_date']}, return {_pct(features['return_window'])}",
+        f"last close: {_num(features['last_close'])}; 5d {_pct(features['return_5d'])}, 21d {_pct(features['return_21d'])}",
+        f"high close: {_num(features['highest_close'])} on {features['highest_close_date']}; "
+        f"low close: {_num(features['lowest_close'])} on {features['lowest_close_date']}",
+        "SMA10/20/50: "
+        + ", ".join(
+            f"{_num(features[f'sma_{w}'])} (price {_pct(features[f'vs_sma_{w}'])})" for w in SMA_WINDOWS
+        ),
+        f"crossover: {cross}",
+        f"ATR{ATR_WINDOW}: {_num(features['atr'])} ({_pct(features['atr_pct'])} of price); "
+        f"{VOLATILITY_WINDOW}d annualized volatility: {_pct(features['volatility'])}",
+        f"volume z-score: {_num(features['volume_z'])}; surges (z>{VOLUME_SURGE_Z:g}) in last {VOLUME_WINDOW}d: "
+        f"{_num(features['recent_surges'], 0)}",
+        f"{SUPPORT_WINDOW}d support/resistance: {_num(features['support'])} / {_num(features['resistance'])}",
+        f"drawdown: current {_pct(features['current_drawdown'])}, max {_pct(features['max_drawdown'])}",
+    ]
+    return "\n".join(lines)
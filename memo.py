@@ -0,0 +1,104 @@
+import os
+import hashlib
+import functools
+from datetime import date, timedelta
+import pandas as pd
+from config import CACHE_DIR, NODE_MEMO_ENABLED, NODE_MEMO_TTL_HOURS, NODE_MEMO_MAX_MB
+from cache import DiskCache, content_key
+import telemetry
+
+# Node-level memoization for the LangGraph nodes. Each memoized node gets a
+# key function that picks out exactly the state it reads; the node's output
+# is stored in SQLite under a fingerprint of those inputs and replayed
+# instead of running the node when they are unchanged.
+
+# Bump when node logic or prompts change so old outputs are not replayed.
+NODE_MEMO_VERSION = 1
+
+node_memo = DiskCache(
+    os.path.join(CACHE_DIR, "node_memo.sqlite"),
+    max_bytes=NODE_MEMO_MAX_MB * 1024 * 1024,
+    ttl_seconds=NODE_MEMO_TTL_HOURS * 3600,
+)
+telemetry.register_cache("node_memo", node_memo)
+
+
+def trading_date(today: date | None = None) -> str:
+    # Most recent weekday; market data keyed on it is refreshed when it rolls.
+    today = today or date.today()
+    while today.weekday() >= 5:
+        today -= timedelta(days=1)
+    return today.isoformat()
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def digest(value) -> str:
+    '''
+    # Stable content hash of a state value. DataFrames are hashed by content
+    # (columns and cell values); dicts, lists and tuples recursively.
+    '''
+    if isinstance(value, pd.DataFrame):
+        row_hashes = pd.util.hash_pandas_object(value, index=False).to_numpy()
+        return content_key("df", tuple(map(str, value.columns)), row_hashes.tobytes())
+    if isinstance(value, dict):
+        return content_key("dict", tuple((str(k), digest(v)) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))))
+    if isinstance(value, (list, tuple)):
+        return content_key("seq", tuple(digest(v) for v in value))
+    return content_key(type(value).__name__, value)
+
+
+def _has_error_report(value) -> bool:
+    if isinstance(value, str):
+        return value.startswith("Error")
+    if isinstance(value, dict):
+        return any(_has_error_report(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_has_error_report(v) for v in value)
+    return False
+
+
+def _is_fallback(output: dict) -> bool:
+    # Outputs produced by an error fallback (an empty fetched frame or an
+    # "Error ..." report anywhere in the output) are not memoized, so a
+    # transient provider failure is retried on the next run instead of
+    # being replayed.
+    if any(isinstance(value, pd.DataFrame) and value.empty for value in output.values()):
+        return True
+    return _has_error_report(output)
+
+
+def memoize_node(name: str, node, inputs):
+    '''
+    # Wrap a graph node so it is skipped when its inputs are unchanged.
+
+    # Args:
+    #     name (str): Node name, part of the key.
+    #     node: The node function, state -> dict.
+    #     inputs: state -> value with everything the node reads (plus anything
+    #         else that should invalidate it, e.g. trading_date()).
+
+    # Returns:
+    #     The wrapped node function.
+    '''
+    if not NODE_MEMO_ENABLED:
+        return node
+
+    @functools.wraps(node)
+    def memoized(state):
+        key = content_key(name, NODE_MEMO_VERSION, digest(inputs(state)))
+        output = node_memo.get(key)
+        if output is not None:
+            return output
+        output = node(state)
+        if not _is_fallback(output):
+            node_memo.put(key, output)
+        return output
+
+    return memoized
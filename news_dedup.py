@@ -0,0 +1,143 @@
+import re
+import zlib
+import numpy as np
+import pandas as pd
+from serialization import MAJOR_SOURCES, rank_headlines
+
+# Near-duplicate headline clustering. Syndicated copies of one story
+# ("Apple beats estimates - Reuters", "Apple Beats Estimates | Yahoo") are
+# collapsed into a single row whose source_count keeps how widely the story
+# was covered. Candidates come from MinHash/LSH over character shingles of
+# the normalized headline and are confirmed with exact Jaccard similarity.
+
+SHINGLE_SIZE = 4
+NUM_PERM = 128
+RECALL_MARGIN = 0.85            # LSH threshold this far below the Jaccard cutoff
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, 2**32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2**32, NUM_PERM, dtype=np.uint64)
+
+# Trailing " - Reuters" / " | Yahoo Finance" attributions
+_ATTRIBUTION = re.compile(r"\s+[-|–—]\s+[^-|–—]{2,40}$")
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_headline(headline: str) -> str:
+    text = _ATTRIBUTION.sub("", str(headline)).lower()
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text)).strip()
+
+
+def shingles(text: str) -> np.ndarray:
+    # 32-bit hashes of the character k-grams (the text itself when shorter)
+    grams = {text[i:i + SHINGLE_SIZE] for i in range(max(len(text) - SHINGLE_SIZE + 1, 1))}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash(hashes: np.ndarray) -> np.ndarray:
+    # (a * x + b) mod p stays below 2**64 for 32-bit a, b and x
+    return ((hashes[:, None] * _A + _B) % _PRIME).min(axis=0)
+
+
+def _find(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def lsh_bands(threshold: float) -> tuple[int, int]:
+    # (bands, rows) with the most rows per band whose candidate threshold,
+    # about (1 / bands) ** (1 / rows), stays RECALL_MARGIN below the cutoff:
+    # 32 x 4 for 0.5. Fewer rows would send far more unrelated pairs to the
+    # exact check.
+    best = (NUM_PERM, 1)
+    for rows in range(1, NUM_PERM + 1):
+        bands = NUM_PERM // rows
+        if NUM_PERM % rows == 0 and (1 / bands) ** (1 / rows) <= threshold * RECALL_MARGIN:
+            best = (bands, rows)
+    return best
+
+
+def cluster_ids(headlines: list[str], threshold: float) -> np.ndarray:
+    '''
+    # Cluster label per headline; headlines whose shingle sets have Jaccard
+    # similarity >= threshold (directly or through a chain) share a label.
+    # Empty headlines are never clustered.
+    '''
+    texts = [normalize_headline(h) for h in headlines]
+    sets = [shingles(t) for t in texts]
+    indexed = [i for i, text in enumerate(texts) if text]
+    signatures = (
+        np.stack([minhash(sets[i]) for i in indexed]) if indexed
+        else np.empty((0, NUM_PERM), dtype=np.uint64)
+    )
+    bands, rows = lsh_bands(threshold)
+
+    parent = list(range(len(texts)))
+    checked = set()
+    for band in range(bands):
+        buckets = {}
+        for i, key in zip(indexed, map(bytes, signatures[:, band * rows:(band + 1) * rows])):
+            buckets.setdefault(key, []).append(i)
+        for members in buckets.values():
+            for n, i in enumerate(members):
+                for j in members[n + 1:]:
+                    if (i, j) in checked or _find(parent, i) == _find(parent, j):
+                        continue
+                    checked.add((i, j))
+                    inter = len(np.intersect1d(sets[i], sets[j], assume_unique=True))
+                    union = len(sets[i]) + len(sets[j]) - inter
+                    if union and inter / union >= threshold:
+                        parent[_find(parent, j)] = _find(parent, i)
+
+    return np.array([_find(parent, i) for i in range(len(texts))])
+
+
+def cluster_headlines(news: pd.DataFrame, threshold: float) -> pd.DataFrame:
+    '''
+    # Collapse near-duplicate articles into one row per story.
+
+    # Args:
+    #     news (pd.DataFrame): datetime, headline, source, url.
+    #     threshold (float): Jaccard similarity (0-1) at which two headlines
+    #         count as the same story.
+
+    # Returns:
+    #     pd.DataFrame: One row per cluster with the representative article's
+    #     headline, source and url (a major outlet when there is one, else
+    #     the earliest), datetime of the latest copy, first_seen,
+    #     source_count (distinct outlets) and article_count. Ranked by
+    #     recency and coverage, best first.
+    '''
+    if news.empty or len(news) < 2:
+        return news.assign(source_count=1, article_count=1) if not news.empty else news
+
+    news = news.reset_index(drop=True)
+    source = news["source"].fillna("").astype(str)
+    work = news.assign(
+        _cluster=cluster_ids(news["headline"].fillna("").tolist(), threshold),
+        _major=source.str.lower().isin(MAJOR_SOURCES),
+        _source=source.str.lower(),
+    )
+
+    grouped = work.groupby("_cluster", sort=False)
+    representative = (
+        work.sort_values(["_major", "datetime"], ascending=[False, True])
+        .drop_duplicates("_cluster")
+        .set_index("_cluster")
+    )
+    clusters = representative[[c for c in news.columns if c != "datetime"]].assign(
+        datetime=grouped["datetime"].max(),
+        first_seen=grouped["datetime"].min(),
+        source_count=grouped["_source"].nunique(),
+        article_count=grouped.size(),
+    ).reset_index(drop=True)
+
+    return (
+        clusters.assign(_score=rank_headlines(clusters))
+        .sort_values("_score", ascending=False, ignore_index=True)
+        .drop(columns="_score")
+    )
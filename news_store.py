@@ -0,0 +1,111 @@
+import os
+import json
+from datetime import datetime, timedelta
+import pandas as pd
+from config import CACHE_DIR, NEWS_STORE_MAX_AGE_MINUTES, NEWS_STORE_RETENTION_DAYS
+import store_io
+
+# Local company-news cache: one Parquet file of articles per ticker, unique
+# on url, plus a JSON sidecar listing the days that are fully fetched. A day
+# only counts as complete once it was fetched after it ended; the current
+# day is tracked separately by the time it was last requested.
+
+NEWS_COLUMNS = ["datetime", "headline", "source", "url"]
+NEWS_STORE_DIR = os.path.join(CACHE_DIR, "news")
+
+def ticker_lock(ticker: str) -> store_io.TickerLock:
+    # Held across threads and processes around a ticker's read-merge-write
+    return store_io.ticker_lock(NEWS_STORE_DIR, ticker)
+
+
+def _articles_path(ticker: str) -> str:
+    return os.path.join(NEWS_STORE_DIR, f"{store_io.file_name(ticker)}.parquet")
+
+
+def _coverage_path(ticker: str) -> str:
+    return os.path.join(NEWS_STORE_DIR, f"{store_io.file_name(ticker)}.json")
+
+
+def read_coverage(ticker: str) -> dict:
+    try:
+        with open(_coverage_path(ticker)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"days": [], "today": None, "today_fetched_at": None}
+
+
+def missing_days(ticker: str, days: list[str]) -> list[str]:
+    '''
+    # Days in the requested window that have to be fetched from the provider.
+
+    # Args:
+    #     ticker (str): Stock ticker symbol.
+    #     days (list[str]): Requested days, YYYY-MM-DD, the last one being today.
+
+    # Returns:
+    #     list[str]: Days not cached yet, plus today if its copy is stale.
+    '''
+    coverage = read_coverage(ticker)
+    complete = set(coverage["days"])
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    missing = [day for day in days if day not in complete]
+    if today in missing and coverage["today"] == today and coverage["today_fetched_at"]:
+        age = datetime.now() - datetime.fromisoformat(coverage["today_fetched_at"])
+        if age <= timedelta(minutes=NEWS_STORE_MAX_AGE_MINUTES):
+            missing.remove(today)
+    return missing
+
+
+def append(ticker: str, articles: list[dict], days: list[str]) -> None:
+    '''
+    # Merge raw Finnhub articles into the ticker's cache (deduplicated on url)
+    # and mark the fetched days as covered. Callers hold ticker_lock(ticker).
+    '''
+    os.makedirs(NEWS_STORE_DIR, exist_ok=True)
+    path = _articles_path(ticker)
+    now = datetime.now()
+    today = now.strftime("%Y-%m-%d")
+    cutoff = int((now - timedelta(days=NEWS_STORE_RETENTION_DAYS)).timestamp())
+
+    frames = []
+    if os.path.exists(path):
+        frames.append(pd.read_parquet(path, columns=NEWS_COLUMNS))
+    if articles:
+        frames.append(pd.DataFrame(articles).reindex(columns=NEWS_COLUMNS))
+    if frames:
+        merged = pd.concat(frames, ignore_index=True)
+        merged["datetime"] = merged["datetime"].astype("int64")
+        merged = (
+            merged[merged["datetime"] >= cutoff]
+            .drop_duplicates(subset="url", keep="last")
+            .sort_values("datetime", ascending=False, ignore_index=True)
+        )
+        with store_io.atomic_write(path) as tmp_path:
+            merged.to_parquet(tmp_path, index=False)
+
+    coverage = read_coverage(ticker)
+    oldest = (now - timedelta(days=NEWS_STORE_RETENTION_DAYS)).strftime("%Y-%m-%d")
+    complete = {day for day in coverage["days"] if day >= oldest}
+    complete.update(day for day in days if day < today)
+    coverage = {"days": sorted(complete), "today": coverage["today"], "today_fetched_at": coverage["today_fetched_at"]}
+    if today in days:
+        coverage["today"] = today
+        coverage["today_fetched_at"] = now.isoformat()
+
+    with store_io.atomic_write(_coverage_path(ticker)) as tmp_path, open(tmp_path, "w") as f:
+        json.dump(coverage, f)
+
+
+def read(ticker: str, since: datetime) -> pd.DataFrame:
+    # Cached articles published at or after `since`, newest first, with
+    # `datetime` still as unix seconds.
+    path = _articles_path(ticker)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=NEWS_COLUMNS)
+    df = pd.read_parquet(
+        path,
+        columns=NEWS_COLUMNS,
+        filters=[("datetime", ">=", int(since.timestamp()))],
+    )
+    return df.sort_values("datetime", ascending=False, ignore_index=True)
@@ -1,165 +1,356 @@
 from typing import cast
-from state import StockInfo, AppState
+from state import StockInfo, AppState, TickerState
 import time
 import pandas as pd
 import datetime as dt
-import finnhub
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 from utils import (
     get_price_history, 
+    get_price_histories,
+    screen_stocks,
     get_news,
     get_price_analysis,
     get_news_analysis,
-    get_stock_advice    
+    get_stock_advice,
+    map_concurrently,
+    invoke_cached,
+    invoke_cached_batch,
+    price_analysis_inputs,
+    news_analysis_inputs,
+    stock_advice_inputs,
+    PRICE_ANALYSIS_PROMPT,
+    NEWS_ANALYSIS_PROMPT,
+    STOCK_ADVICE_PROMPT,
 )
+from config import FINNHUB_MAX_CONCURRENCY, PANEL_STATE, RISK_BENCHMARK_TICKER
+from indicators import compute_indicator_panel
+from artifacts import load_report, save_report, hit_rates
+from sentiment import screen_news
+from risk import close_matrix, compute_portfolio_risk, format_risk_block, risk_score as headline_risk
+from portfolio_io import read_portfolio, to_stock_infos
+from watchlist import watchlist
+from panel import PortfolioPanel, merge_panels, stock_prices, stock_news
 import os
 from langchain_core.messages import AnyMessage  # if you're using LangGraph
 from langchain_core.prompts import PromptTemplate
-from langchain_groq import ChatGroq
-from openbb import obb
+from clients import get_llm
+from telemetry import log
 
-llm = ChatGroq(
-    temperature=0.35,
-    model_name="llama-3.1-8b-instant",
-    api_key=os.environ.get("GROQ_API_KEY"),
-)
+# The summary is written a little more freely than the per-ticker analyses
+SUMMARY_TEMPERATURE = 0.35
 
 
-# Initialize the Finnhub client
-load_dotenv()
-finnhub_client = finnhub.Client(api_key=os.getenv("FINNHUB_API_KEY")) 
+def load_portfolio(state: AppState) -> dict:
+    # Holdings the caller already validated with read_portfolio when
+    # available, otherwise the CSV path is read here
+    holdings = state.get("holdings")
+    if holdings is None:
+        holdings = read_portfolio(state.get("user_uploaded_file"))
+    return {"portfolio": to_stock_infos(holdings)}
 
 
-def load_portfolio(state: AppState) -> dict:
-    import pandas as pd
-    from datetime import datetime
-
-    file_path = state.get("user_uploaded_file")
-    df = pd.read_csv(file_path)
-
-    portfolio = []
-    for _, row in df.iterrows():
-        stock = StockInfo(
-            ticker=row["Ticker"],
-            shares_held=row["Shares Held"],
-            buy_price=row["Buy Price"],
-            current_price=row["Current Price"],
-            sector=row["Sector"],
-            purchase_date=row["Purchase Date"],
-            prices=pd.DataFrame(),  # placeholder
-            news=pd.DataFrame(),    # placeholder
-            price_analyst_report="",
-            news_analyst_report="",
-            recommendation=""
+def price_window() -> tuple[str, str]:
+    start_date = (dt.datetime.now() - dt.timedelta(days=180)).strftime("%Y-%m-%d")
+    end_date = dt.datetime.now().strftime("%Y-%m-%d")
+    return start_date, end_date
+
+
+def preferences(state) -> dict:
+    return {
+        "risk_tolerance": state["risk_tolerance"],
+        "investment_horizon": state["investment_horizon"],
+        "objective": state.get("objective", "Balanced"),
+        "liquidity_needs": state.get("liquidity_needs", "Medium"),
+    }
+
+
+def analyze_prices(ticker: str, prices: pd.DataFrame, features: dict | None = None) -> str:
+    log.debug("Analyzing price data for %s", ticker)
+    if prices.empty:
+        log.debug("No price rows for %s; skipping price analysis", ticker)
+        return "No price data available"
+    report = load_report("price", ticker, prices, PRICE_ANALYSIS_PROMPT)
+    if report is not None:
+        log.debug("Reusing today's price analysis for %s", ticker)
+        return report
+    try:
+        report= get_price_analysis(ticker, prices, features)
+        log.debug("Price analysis for %s completed", ticker)
+        save_report("price", ticker, prices, PRICE_ANALYSIS_PROMPT, report)
+        return report
+    except Exception as e:
+        return f"Error in price analysis for {ticker} - {e}"
+
+
+def analyze_news(ticker: str, news: pd.DataFrame, local_report: str = "") -> str:
+    # local_report: templated report from the book-level sentiment screen,
+    # used instead of the LLM when the screen did not escalate the ticker.
+    if news.empty:
+        return "No news data available"
+    news_report = load_report("news", ticker, news, NEWS_ANALYSIS_PROMPT)
+    if news_report is not None:
+        log.debug("Reusing today's news analysis for %s", ticker)
+        return news_report
+    if local_report:
+        return local_report
+    try:
+        news_report = get_news_analysis(ticker, news)
+        log.debug("News analysis for %s completed", ticker)
+        save_report("news", ticker, news, NEWS_ANALYSIS_PROMPT, news_report)
+        return news_report
+    except Exception as e:
+        return f"Error in news analysis for {ticker} - {e}"
+
+
+def advise(ticker: str, price_report: str, news_report: str, prefs: dict) -> str:
+    try:
+        recommendation = get_stock_advice(
+            ticker, price_report, news_report,
+            prefs["risk_tolerance"], prefs["investment_horizon"], prefs["objective"], prefs["liquidity_needs"]
         )
-        portfolio.append(stock)
+        log.debug("Advice for %s: %s", ticker, recommendation)
+        return recommendation
+    except Exception as e:
+        return f"Error generating advice for {ticker} - {e}"
 
-    return {"portfolio": portfolio}
+
+def prefetch_node(state: AppState) -> dict:
+    # Warm the price store for the whole book with a few multi-symbol
+    # requests while the news store is filled alongside, so the per-ticker
+    # fetch nodes only read from disk. The book's headlines are then scored
+    # in one pass (sentiment.py); each ticker pipeline is handed its local
+    # news report, or none when its news needs the LLM.
+    start_date, end_date = price_window()
+    tickers = [stock["ticker"] for stock in state["portfolio"]]
+    try:
+        # Keeps the book's tickers warm for later runs (prewarm.py). Recorded
+        # here because load_portfolio is skipped on a memo hit.
+        watchlist.add(tickers)
+    except Exception as e:
+        log.warning("Error updating the watchlist - %s", e)
+    log.info("Prefetching price history and news for %d tickers from %s to %s", len(tickers), start_date, end_date)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        prices = pool.submit(get_price_histories, tickers, start=start_date, end=end_date)
+        fetched = map_concurrently(get_news, tickers, max_workers=FINNHUB_MAX_CONCURRENCY)
+        results = prices.result()
+    for ticker, result in results.items():
+        if isinstance(result, Exception):
+            log.warning("%s", result)
+
+    # Fetch errors are reported by the per-ticker news fetchers
+    news = {
+        ticker: news_df for ticker, news_df in zip(tickers, fetched)
+        if not isinstance(news_df, Exception) and not news_df.empty
+    }
+    return {"news_screen": screen_news(news)}
 
 
 def price_history_node(state: AppState) -> dict:
-    start_date = (dt.datetime.now() - dt.timedelta(days=180)).strftime("%Y-%m-%d")
-    end_date = dt.datetime.now().strftime("%Y-%m-%d")
+    start_date, end_date = price_window()
+    tickers = [stock["ticker"] for stock in state["portfolio"]]
+    log.info("Fetching price history for %d tickers from %s to %s", len(tickers), start_date, end_date)
+    fetched = get_price_histories(tickers, start=start_date, end=end_date)
+    results = [fetched[ticker] for ticker in tickers]
 
     updated_portfolio = []
+    panel = None
 
-    for stock in state["portfolio"]:
+    for stock, price_df in zip(state["portfolio"], results):
         ticker = stock["ticker"]
-        print(f"\nFetching price history for: {ticker} from {start_date} to {end_date}")
-        try:
-            price_df = get_price_history(ticker, start=start_date, end=end_date)
-            print(f"{ticker} — rows fetched: {len(price_df)}")
+        if isinstance(price_df, Exception):
+            log.warning("Error fetching price history for %s - %s", ticker, price_df)
+            price_df = pd.DataFrame()  # fallback
+        else:
+            log.debug("%s — rows fetched: %d", ticker, len(price_df))
+        if PANEL_STATE:
+            panel = merge_panels(panel, PortfolioPanel.from_frames(ticker, prices=price_df))
+        else:
             stock["prices"] = price_df
-            # print(price_df.head(2))
-        except Exception as e:
-            print(f"Error fetching price history for {ticker} - {e}")
-            stock["prices"] = pd.DataFrame()  # fallback
         updated_portfolio.append(stock)
 
+    if PANEL_STATE:
+        return {"portfolio": updated_portfolio, "panel": panel}
     return {"portfolio": updated_portfolio}
 
 
 
 def news_fetch_node(state: AppState) -> dict:
+    tickers = [stock["ticker"] for stock in state["portfolio"]]
+    results = map_concurrently(get_news, tickers, max_workers=FINNHUB_MAX_CONCURRENCY)
+
     updated_portfolio = []
+    panel = None
 
-    for stock in state["portfolio"]:
+    for stock, news_df in zip(state["portfolio"], results):
         ticker = stock["ticker"]
-        try:
-
-            news_df = get_news(ticker)
+        if isinstance(news_df, Exception):
+            log.warning("Error fetching news for %s - %s", ticker, news_df)
+            news_df = pd.DataFrame()  # fallback
+        else:
+            log.debug("Fetched news for %s", ticker)
+        if PANEL_STATE:
+            panel = merge_panels(panel, PortfolioPanel.from_frames(ticker, news=news_df))
+        else:
             stock["news"] = news_df
-            print(f"Fetching news for: {ticker}")
-            # print(news_df.head())
-        except Exception as e:
-            stock["news"] = pd.DataFrame()  # fallback
         updated_portfolio.append(stock)
 
+    if PANEL_STATE:
+        return {"portfolio": updated_portfolio, "panel": panel}
     return {"portfolio": updated_portfolio}
 
 
+def _stored_reports(kind: str, prompt, data: dict) -> dict:
+    # Reports for {ticker: data} already in the shared artifact store
+    stored = {}
+    for ticker, frame in data.items():
+        if frame.empty or ticker in stored:
+            continue
+        report = load_report(kind, ticker, frame, prompt)
+        if report is not None:
+            stored[ticker] = report
+    return stored
+
+
+def _save_reports(kind: str, prompt, data: dict, reports: dict) -> None:
+    for ticker, report in reports.items():
+        save_report(kind, ticker, data[ticker], prompt, report)
+    stats = hit_rates().get(kind)
+    if stats:
+        log.info("%s reports: %d reused, %d computed (hit rate %.0f%%)", kind, stats["hits"], stats["misses"], stats["hit_rate"] * 100)
+
+
+def _batch_reports(llm, prompt, requests: dict, error_prefix: str) -> dict:
+    # Run {ticker: prompt inputs} as one batch; failed tickers get an error
+    # report instead of failing the whole node.
+    tickers = list(requests)
+    replies = invoke_cached_batch(llm, prompt, [requests[t] for t in tickers])
+    return {
+        ticker: f"{error_prefix} for {ticker} - {reply}" if isinstance(reply, Exception) else reply
+        for ticker, reply in zip(tickers, replies)
+    }
+
+
 def price_analysis_node(state: AppState) -> dict:
     updated_portfolio = []
+    prices = {stock["ticker"]: stock_prices(state, stock) for stock in state["portfolio"]}
+    # Indicators for the whole book in one vectorized pass
+    features = compute_indicator_panel(prices)
 
+    stored = _stored_reports("price", PRICE_ANALYSIS_PROMPT, prices)
+    requests = {}
     for stock in state["portfolio"]:
         ticker = stock["ticker"]
-        print(f"\nAnalyzing price data for: {ticker}")
-        if stock["prices"].empty:
-            stock["price_analyst_report"] = "No price data available"
-            updated_portfolio.append(stock)
-            print("erroor")
+        if prices[ticker].empty or ticker in requests or ticker in stored:
             continue
         try:
-            # Simulate a price analysis report
-            report= get_price_analysis(ticker, stock["prices"])
-            print("log test")
-            stock["price_analyst_report"] = report
-            print(f"Price analysis for {ticker} completed successfully.")
+            ticker_features = features.loc[ticker].to_dict() if ticker in features.index else None
+            requests[ticker] = price_analysis_inputs(ticker, prices[ticker], ticker_features)
         except Exception as e:
-            stock["price_analyst_report"] = f"Error in price analysis for {ticker} - {e}"
+            log.warning("Error preparing price analysis for %s - %s", ticker, e)
+    reports = _batch_reports(get_llm(), PRICE_ANALYSIS_PROMPT, requests, "Error in price analysis")
+    _save_reports("price", PRICE_ANALYSIS_PROMPT, prices, reports)
+    reports.update(stored)
+
+    for stock in state["portfolio"]:
+        ticker = stock["ticker"]
+        if prices[ticker].empty:
+            report = "No price data available"
+        else:
+            report = reports.get(ticker, f"Error in price analysis for {ticker} - could not build prompt")
+        stock["price_analyst_report"] = report
         updated_portfolio.append(stock)
         
     return {"portfolio": updated_portfolio}    
 
 def news_analysis_node(state: AppState) -> dict:
     updated_portfolio = []
+    news = {stock["ticker"]: stock_news(state, stock) for stock in state["portfolio"]}
 
+    stored = _stored_reports("news", NEWS_ANALYSIS_PROMPT, news)
+    # Quiet, one-sided news gets a local report; only the rest goes to the LLM
+    stored.update(screen_news({t: n for t, n in news.items() if not n.empty and t not in stored}))
+    requests = {}
     for stock in state["portfolio"]:
         ticker = stock["ticker"]
-        if stock["news"].empty:
-            stock["news_analyst_report"] = "No news data available"
-            updated_portfolio.append(stock)
+        if news[ticker].empty or ticker in requests or ticker in stored:
             continue
         try:
-            news_report = get_news_analysis(ticker, stock["news"])
-            stock["news_analyst_report"] = news_report
-            print(f"News analysis for {ticker} completed successfully.")
+            requests[ticker] = news_analysis_inputs(ticker, news[ticker])
         except Exception as e:
-            stock["news_analyst_report"] = f"Error in news analysis for {ticker} - {e}"
+            log.warning("Error preparing news analysis for %s - %s", ticker, e)
+    reports = _batch_reports(get_llm(), NEWS_ANALYSIS_PROMPT, requests, "Error in news analysis")
+    _save_reports("news", NEWS_ANALYSIS_PROMPT, news, reports)
+    reports.update(stored)
+
+    for stock in state["portfolio"]:
+        ticker = stock["ticker"]
+        if news[ticker].empty:
+            report = "No news data available"
+        else:
+            report = reports.get(ticker, f"Error in news analysis for {ticker} - could not build prompt")
+        stock["news_analyst_report"] = report
         updated_portfolio.append(stock)
 
     return {"portfolio": updated_portfolio}
 
 def stock_advice_node(state: AppState) -> dict:
     updated_portfolio = []
+    prefs = preferences(state)
+
+    requests = {
+        stock["ticker"]: stock_advice_inputs(
+            stock["ticker"], stock["price_analyst_report"], stock["news_analyst_report"],
+            prefs["risk_tolerance"], prefs["investment_horizon"], prefs["objective"], prefs["liquidity_needs"]
+        )
+        for stock in state["portfolio"]
+    }
+    recommendations = _batch_reports(get_llm(), STOCK_ADVICE_PROMPT, requests, "Error generating advice")
 
     for stock in state["portfolio"]:
-        ticker = stock["ticker"]
-        try:
-            # Simulate a stock advice report
-            risk_tolerance = state["risk_tolerance"]
-            horizon = state["investment_horizon"]
-            objective = state.get("objective", "Balanced")
-            liquidity_needs = state.get("liquidity_needs", "Medium")
-            recommendation = get_stock_advice(ticker, stock["price_analyst_report"], stock["news_analyst_report"], risk_tolerance, horizon, objective, liquidity_needs)
-            stock["recommendation"] = recommendation
-            print(f"Advice for {ticker}: {recommendation}")
-        except Exception as e:
-            stock["recommendation"] = f"Error generating advice for {ticker} - {e}"
+        stock["recommendation"] = recommendations[stock["ticker"]]
         updated_portfolio.append(stock)
 
     return {"portfolio": updated_portfolio}
 
+
+# --- Per-ticker subgraph nodes (one instance per holding, see graph_builder) ---
+
+def ticker_price_history_node(state: TickerState) -> dict:
+    ticker = state["stock"]["ticker"]
+    start_date, end_date = price_window()
+    log.debug("Fetching price history for %s from %s to %s", ticker, start_date, end_date)
+    try:
+        price_df = get_price_history(ticker, start=start_date, end=end_date)
+        log.debug("%s — rows fetched: %d", ticker, len(price_df))
+    except Exception as e:
+        log.warning("Error fetching price history for %s - %s", ticker, e)
+        price_df = pd.DataFrame()  # fallback
+    return {"prices": price_df}
+
+def ticker_news_fetch_node(state: TickerState) -> dict:
+    ticker = state["stock"]["ticker"]
+    try:
+        news_df = get_news(ticker)
+        log.debug("Fetched news for %s", ticker)
+    except Exception as e:
+        log.warning("Error fetching news for %s - %s", ticker, e)
+        news_df = pd.DataFrame()  # fallback
+    return {"news": news_df}
+
+def ticker_price_analysis_node(state: TickerState) -> dict:
+    return {"price_analyst_report": analyze_prices(state["stock"]["ticker"], state["prices"])}
+
+def ticker_news_analysis_node(state: TickerState) -> dict:
+    return {"news_analyst_report": analyze_news(
+        state["stock"]["ticker"], state["news"], state.get("local_news_report", "")
+    )}
+
+def ticker_advice_node(state: TickerState) -> dict:
+    recommendation = advise(
+        state["stock"]["ticker"], state["price_analyst_report"], state["news_analyst_report"], preferences(state)
+    )
+    return {"recommendation": recommendation}
+
 def suggest_stocks_node(state: AppState) -> dict:
     suggestions= []
     current_tickers = {stock["ticker"] for stock in state["portfolio"]}
@@ -177,31 +368,55 @@ def suggest_stocks_node(state: AppState) -> dict:
         category = "Balanced Picks"
 
     try:
-        screener_df = obb.stocks.screener(limit=20, filters=filters)
-
-        for _, row in screener_df.iterrows():
-            ticker = row["symbol"]
+        for row in screen_stocks(filters, limit=20):
+            ticker = row["ticker"]
             if ticker in current_tickers:
                 continue
 
-            suggestion = {
+            suggestions.append({
                 "ticker": ticker,
                 "category": category,
                 "reason": f"Matches your profile: {risk} risk, {horizon} investment",
-            }
+                "news": row["news"],
+            })
+
+    except Exception as e:
+        log.warning("Error fetching suggestions: %s", e)
+
+    return{"suggestions":suggestions}     
 
-            try:
-                news = obb.stocks.news(ticker)
-                suggestion["news"] = news["title"].head(2).tolist() if "title" in news else []
-            except Exception:
-                suggestion["news"] = []
+def benchmark_closes() -> pd.Series | None:
+    if not RISK_BENCHMARK_TICKER:
+        return None
+    start_date, end_date = price_window()
+    try:
+        prices = get_price_history(RISK_BENCHMARK_TICKER, start=start_date, end=end_date)
+        return prices.set_index("date")["close"]
+    except Exception as e:
+        log.warning("Error fetching benchmark %s - %s", RISK_BENCHMARK_TICKER, e)
+        return None
 
-            suggestions.append(suggestion)
 
+def portfolio_risk(state: AppState) -> dict:
+    portfolio = state["portfolio"]
+    values, sectors = {}, {}
+    for stock in portfolio:
+        values[stock["ticker"]] = values.get(stock["ticker"], 0.0) + stock["shares_held"] * stock["current_price"]
+        sectors[stock["ticker"]] = stock["sector"]
+
+    panel = state.get("panel") if PANEL_STATE else None
+    if panel is not None and not panel.price_tickers:
+        return {}
+    try:
+        if panel is not None:
+            closes = panel.close_matrix()
+        else:
+            closes = close_matrix({stock["ticker"]: stock_prices(state, stock) for stock in portfolio})
+        return compute_portfolio_risk(closes, values, sectors, benchmark_closes())
     except Exception as e:
-        print(f"Error fetching suggestions: {e}")   
+        log.warning("Error computing portfolio risk - %s", e)
+        return {}
 
-    return{"suggestions":suggestions}     
 
 def summarize_node(state: AppState) -> dict:
     updated_summary= {}
@@ -229,12 +444,10 @@ def summarize_node(state: AppState) -> dict:
         sector: round((value / current_value) * 100, 2) for sector, value in sector_totals.items()
     }
 
-    # Risk Score (simple volatility measure)
-    returns = [
-        (stock["current_price"] - stock["buy_price"]) / stock["buy_price"]
-        for stock in portfolio if stock["buy_price"] > 0
-    ]
-    risk_score = round((pd.Series(returns).std() or 0.0) * 100, 2)
+    # Risk from the fetched daily price histories (weights, correlations)
+    risk = portfolio_risk(state)
+    risk_score = headline_risk(risk)
+    risk_metrics = format_risk_block(risk)
 
     # Format individual stock advice snippets
     stock_summaries = []
@@ -260,7 +473,9 @@ def summarize_node(state: AppState) -> dict:
         Current Value: ₹{current_value}
         Profit/Loss: ₹{profit_loss} ({profit_loss_percent:.2f}%)
         Diversification: {diversification}
-        Estimated Risk Score: {risk_score}/100
+        Estimated Risk Score: {risk_score}/100 (annualized volatility, %)
+        Risk Metrics:
+        {risk_metrics}
 
         Here are the individual stock summaries:
         {stock_summary_text}
@@ -277,16 +492,14 @@ def summarize_node(state: AppState) -> dict:
         - Also check if any of the system suggested stocks other than the existing tickers are relevant to the portfolio. If yes, then suggest and explain why.
         - Also consider the individual stock advicecs provided, wherein If there are any stocks with significant issues or recommendations, highlight them.
         - Also, provide a final recommendation on whether the user should rebalance, hold, or take any specific actions with their portfolio.
-        - You should also relate the risk score to the risk tolerance and investment horizon provided.
+        - You should also relate the risk score and risk metrics (VaR, drawdown, beta, concentration) to the risk tolerance and investment horizon provided.
         """,
         input_variables=["risk_tolerance", "horizon", "objective", "liquidity_needs","total_investment", "current_value",
                         "profit_loss", "profit_loss_percent", "diversification",
-                        "risk_score", "stock_summary_text", "suggestions"]
+                        "risk_score", "risk_metrics", "stock_summary_text", "suggestions"]
     )
 
-    chain = prompt | llm
-
-    result = chain.invoke({
+    updated_summary = invoke_cached(get_llm(SUMMARY_TEMPERATURE), prompt, {
         "risk_tolerance":risk_tolerance,
         "horizon":horizon,
         "objective":objective,
@@ -297,11 +510,10 @@ def summarize_node(state: AppState) -> dict:
         "profit_loss_percent":profit_loss_percent,
         "diversification":diversification,
         "risk_score":risk_score,
+        "risk_metrics":risk_metrics,
         "stock_summary_text":stock_summary_text,
         "suggestions": suggestions
     })
-    
-    updated_summary= result.content
-    print(f"Final summary generated: {updated_summary}")
+    log.debug("Final summary generated: %s", updated_summary)
     return {"summary": updated_summary}
     
\ No newline at end of file
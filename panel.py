@@ -0,0 +1,180 @@
+import threading
+import pandas as pd
+from config import PANEL_STATE
+
+# Optional columnar representation of the book's market data: one
+# long-format price table and one news table for all tickers, with the
+# ticker stored as a categorical column, instead of two DataFrames inside
+# every StockInfo. Enabled with PANEL_STATE=1; per-ticker callers go through
+# stock_prices / stock_news, which work in either mode.
+
+EMPTY_FRAME = pd.DataFrame()
+
+
+class PortfolioPanel:
+    '''
+    # Long-format price and news tables for a whole book.
+
+    # Pieces added by parallel per-ticker branches are only concatenated on
+    # first read, so merging N tickers costs one concat rather than N.
+    '''
+
+    def __init__(
+        self,
+        prices: list[pd.DataFrame] | None = None,
+        news: list[pd.DataFrame] | None = None,
+        price_tickers: set[str] | None = None,
+        news_tickers: set[str] | None = None,
+    ):
+        self._price_pieces = [piece for piece in prices or [] if not piece.empty]
+        self._news_pieces = [piece for piece in news or [] if not piece.empty]
+        # Tickers each table has an entry for (possibly with no rows)
+        self.price_tickers = set(price_tickers) if price_tickers is not None else self._tickers_in(self._price_pieces)
+        self.news_tickers = set(news_tickers) if news_tickers is not None else self._tickers_in(self._news_pieces)
+        self._prices = None
+        self._news = None
+        self._price_rows = None
+        self._news_rows = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _tickers_in(pieces: list[pd.DataFrame]) -> set[str]:
+        return {ticker for piece in pieces for ticker in piece["ticker"].unique()}
+
+    @classmethod
+    def from_frames(cls, ticker: str, prices: pd.DataFrame | None = None, news: pd.DataFrame | None = None) -> "PortfolioPanel":
+        # A frame passed as None leaves that table untouched when merged
+        def tagged(df):
+            if df is None or df.empty:
+                return []
+            return [df.assign(ticker=ticker)]
+        return cls(
+            tagged(prices), tagged(news),
+            {ticker} if prices is not None else set(),
+            {ticker} if news is not None else set(),
+        )
+
+    @classmethod
+    def from_portfolio(cls, portfolio: list) -> "PortfolioPanel":
+        panel = cls()
+        for stock in portfolio:
+            panel = merge_panels(panel, cls.from_frames(stock["ticker"], stock.get("prices"), stock.get("news")))
+        return panel
+
+    @staticmethod
+    def _consolidate(pieces: list[pd.DataFrame], sort_by: str) -> tuple[pd.DataFrame, dict]:
+        if not pieces:
+            return pd.DataFrame(columns=["ticker"]), {}
+        table = pd.concat(pieces, ignore_index=True)
+        table["ticker"] = table["ticker"].astype("category")
+        table = table.sort_values(["ticker", sort_by], ignore_index=True, kind="stable")
+        # Row positions per ticker, so per-ticker reads are a slice, not a scan
+        rows = table.groupby("ticker", observed=True, sort=False).indices
+        return table, rows
+
+    def _ensure(self) -> None:
+        with self._lock:
+            if self._prices is None:
+                self._prices, self._price_rows = self._consolidate(self._price_pieces, "date")
+                self._news, self._news_rows = self._consolidate(self._news_pieces, "datetime")
+                self._price_pieces, self._news_pieces = [], []
+
+    @property
+    def prices(self) -> pd.DataFrame:
+        # ticker (categorical), date, open, high, low, close, volume
+        self._ensure()
+        return self._prices
+
+    @property
+    def news(self) -> pd.DataFrame:
+        # ticker (categorical), datetime, headline, source, url, ...
+        self._ensure()
+        return self._news
+
+    def prices_for(self, ticker: str) -> pd.DataFrame:
+        self._ensure()
+        rows = self._price_rows.get(ticker)
+        if rows is None:
+            return EMPTY_FRAME
+        return self._prices.iloc[rows].drop(columns="ticker").reset_index(drop=True)
+
+    def news_for(self, ticker: str) -> pd.DataFrame:
+        self._ensure()
+        rows = self._news_rows.get(ticker)
+        if rows is None:
+            return EMPTY_FRAME
+        return (
+            self._news.iloc[rows].drop(columns="ticker")
+            .sort_values("datetime", ascending=False, ignore_index=True)
+        )
+
+    def price_frames(self) -> dict[str, pd.DataFrame]:
+        self._ensure()
+        return {ticker: self.prices_for(ticker) for ticker in self._price_rows}
+
+    def close_matrix(self) -> pd.DataFrame:
+        # Wide date x ticker closes for cross-ticker work (e.g. risk)
+        return self.prices.pivot_table(index="date", columns="ticker", values="close", aggfunc="last", observed=True)
+
+    def memory_usage(self) -> int:
+        return int(self.prices.memory_usage(deep=True).sum() + self.news.memory_usage(deep=True).sum())
+
+    def __getstate__(self):
+        # Pickle the consolidated tables (the lock is not picklable)
+        self._ensure()
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def merge_panels(current: PortfolioPanel | None, update: PortfolioPanel | None) -> PortfolioPanel:
+    # Reducer for AppState.panel. Tickers in the update replace the same
+    # tickers in the matching table of the current panel; otherwise pieces
+    # are just collected.
+    if current is None:
+        return update
+    if update is None:
+        return current
+
+    merged = {}
+    for kind in ("price", "news"):
+        table_name = "_prices" if kind == "price" else "_news"
+        current_pieces = getattr(current, f"_{kind}_pieces") + [
+            table for table in [getattr(current, table_name)] if table is not None
+        ]
+        update_pieces = getattr(update, f"_{kind}_pieces") + [
+            table for table in [getattr(update, table_name)] if table is not None
+        ]
+        current_tickers = getattr(current, f"{kind}_tickers")
+        update_tickers = getattr(update, f"{kind}_tickers")
+        replaced = current_tickers & update_tickers
+        if replaced:
+            current_pieces = [piece[~piece["ticker"].isin(replaced)] for piece in current_pieces]
+        merged[kind] = (current_pieces + update_pieces, current_tickers | update_tickers)
+
+    return PortfolioPanel(merged["price"][0], merged["news"][0], merged["price"][1], merged["news"][1])
+
+
+def _state_panel(state) -> PortfolioPanel | None:
+    # The panel is only read when PANEL_STATE is on; otherwise the frames
+    # live on each StockInfo, whatever the state's panel channel holds.
+    return state.get("panel") if PANEL_STATE else None
+
+
+def stock_prices(state, stock) -> pd.DataFrame:
+    # Per-ticker accessor that works with and without the panel
+    panel = _state_panel(state)
+    if panel is not None:
+        return panel.prices_for(stock["ticker"])
+    return stock.get("prices", EMPTY_FRAME)
+
+
+def stock_news(state, stock) -> pd.DataFrame:
+    panel = _state_panel(state)
+    if panel is not None:
+        return panel.news_for(stock["ticker"])
+    return stock.get("news", EMPTY_FRAME)
@@ -0,0 +1,170 @@
+import pandas as pd
+from state import StockInfo
+from config import PORTFOLIO_CHUNK_ROWS
+
+# Vectorized, schema-validated portfolio CSV loading. Rows are lots: the
+# same ticker may appear several times and is aggregated into one holding
+# (total shares, share-weighted average buy price, earliest purchase date).
+
+PORTFOLIO_DTYPES = {
+    "Ticker": "string",
+    "Company Name": "string",
+    "Shares Held": "float64",
+    "Buy Price": "float64",
+    "Current Price": "float64",
+    "Sector": "string",
+    "Purchase Date": "string",
+}
+REQUIRED_COLUMNS = ["Ticker", "Shares Held", "Buy Price", "Current Price", "Sector", "Purchase Date"]
+# Exchange symbols (BRK.B, BF-B, ^GSPC, EURUSD=X). Tickers also name files in
+# the local stores, so anything else (slashes, "..") is rejected.
+TICKER_PATTERN = r"^[A-Z0-9.\-^=]{1,15}$"
+
+
+class PortfolioValidationError(ValueError):
+    pass
+
+
+def _describe(tickers) -> str:
+    tickers = sorted(set(map(str, tickers)))
+    shown = ", ".join(tickers[:10])
+    return shown + (f" and {len(tickers) - 10} more" if len(tickers) > 10 else "")
+
+
+def _validate_columns(columns) -> None:
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise PortfolioValidationError(
+            f"Portfolio CSV is missing required column(s): {', '.join(missing)}. "
+            f"Expected: {', '.join(REQUIRED_COLUMNS)}"
+        )
+
+
+def _clean_chunk(chunk: pd.DataFrame, first_row: int) -> pd.DataFrame:
+    _validate_columns(chunk.columns)
+    chunk = chunk[[col for col in PORTFOLIO_DTYPES if col in chunk.columns]]
+    try:
+        chunk = chunk.astype({col: PORTFOLIO_DTYPES[col] for col in chunk.columns})
+    except (ValueError, TypeError) as e:
+        raise PortfolioValidationError(f"Portfolio CSV has a value of the wrong type: {e}")
+
+    purchase_dates = pd.to_datetime(chunk["Purchase Date"], errors="coerce")
+    tickers = chunk["Ticker"].str.strip().str.upper()
+    problems = {
+        "missing values": chunk[REQUIRED_COLUMNS].isna().any(axis=1),
+        "non-positive Shares Held": chunk["Shares Held"] <= 0,
+        "negative Buy Price": chunk["Buy Price"] < 0,
+        "negative Current Price": chunk["Current Price"] < 0,
+        "invalid Purchase Date": purchase_dates.isna() & chunk["Purchase Date"].notna(),
+        "invalid Ticker": ~tickers.str.fullmatch(TICKER_PATTERN) & tickers.notna(),
+    }
+    for problem, mask in problems.items():
+        mask = mask.to_numpy(dtype=bool, na_value=True)
+        if mask.any():
+            rows = (mask.nonzero()[0][:10] + first_row + 2).tolist()  # +2: header, 1-based
+            raise PortfolioValidationError(f"Portfolio CSV has {problem} in row(s) {rows}")
+
+    return chunk.assign(
+        Ticker=tickers,
+        Sector=chunk["Sector"].str.strip(),
+        **{"Purchase Date": purchase_dates.dt.strftime("%Y-%m-%d")},
+    )
+
+
+def _check_sectors(grouped, column: str) -> None:
+    sectors = grouped[column].nunique()
+    if (sectors > 1).any():
+        raise PortfolioValidationError(
+            f"Ticker(s) listed under more than one sector: {_describe(sectors.index[sectors > 1])}"
+        )
+
+
+def _aggregate_lots(lots: pd.DataFrame) -> pd.DataFrame:
+    lots = lots.assign(_cost=lots["Shares Held"] * lots["Buy Price"])
+    grouped = lots.groupby("Ticker", sort=False)
+    _check_sectors(grouped, "Sector")
+
+    aggregations = {
+        "shares_held": ("Shares Held", "sum"),
+        "cost": ("_cost", "sum"),
+        "current_price": ("Current Price", "last"),
+        "sector": ("Sector", "first"),
+        "purchase_date": ("Purchase Date", "min"),
+        "lots": ("Shares Held", "size"),
+    }
+    if "Company Name" in lots:
+        aggregations["company_name"] = ("Company Name", "first")
+    return grouped.agg(**aggregations).reset_index()
+
+
+def _combine_partials(partials: pd.DataFrame) -> pd.DataFrame:
+    grouped = partials.groupby("Ticker", sort=False)
+    _check_sectors(grouped, "sector")
+
+    aggregations = {
+        "shares_held": ("shares_held", "sum"),
+        "cost": ("cost", "sum"),
+        "current_price": ("current_price", "last"),
+        "sector": ("sector", "first"),
+        "purchase_date": ("purchase_date", "min"),
+        "lots": ("lots", "sum"),
+    }
+    if "company_name" in partials:
+        aggregations["company_name"] = ("company_name", "first")
+    return grouped.agg(**aggregations).reset_index()
+
+
+def read_portfolio(source, chunksize: int = PORTFOLIO_CHUNK_ROWS) -> pd.DataFrame:
+    '''
+    # Load, validate and aggregate a portfolio.
+
+    # Args:
+    #     source: CSV path or file-like object, or an already parsed DataFrame.
+    #     chunksize (int): Rows read per chunk for CSV sources.
+
+    # Returns:
+    #     pd.DataFrame: One row per ticker with ticker, shares_held, buy_price,
+    #     current_price, sector, purchase_date, lots (and company_name when
+    #     the CSV has it).
+
+    # Raises:
+    #     PortfolioValidationError: On missing columns, bad values or
+    #     conflicting lots.
+    '''
+    partials, first_row = [], 0
+    try:
+        if isinstance(source, pd.DataFrame):
+            chunks = [source]
+        else:
+            chunks = pd.read_csv(
+                source,
+                usecols=lambda col: col in PORTFOLIO_DTYPES,
+                dtype="string",
+                chunksize=chunksize,
+            )
+        for chunk in chunks:
+            # Lots are collapsed per chunk, so memory is bounded by the number
+            # of distinct tickers rather than rows
+            partials.append(_aggregate_lots(_clean_chunk(chunk, first_row)))
+            first_row += len(chunk)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        raise PortfolioValidationError(f"Could not read portfolio CSV: {e}")
+
+    if not partials:
+        raise PortfolioValidationError("Portfolio CSV has no rows")
+    holdings = partials[0] if len(partials) == 1 else _combine_partials(pd.concat(partials, ignore_index=True))
+    if holdings.empty:
+        raise PortfolioValidationError("Portfolio CSV has no rows")
+
+    holdings["buy_price"] = holdings["cost"] / holdings["shares_held"]
+    return holdings.drop(columns="cost").rename(columns={"Ticker": "ticker"})
+
+
+def to_stock_infos(holdings: pd.DataFrame) -> list[StockInfo]:
+    # prices/news are left out; the fetch nodes add them.
+    records = holdings[
+        ["ticker", "shares_held", "buy_price", "current_price", "sector", "purchase_date"]
+    ].to_dict("records")
+    for record in records:
+        record.update(price_analyst_report="", news_analyst_report="", recommendation="")
+    return records
@@ -0,0 +1,145 @@
+"""Keep market data and ticker-level analyst reports warm for a watchlist.
+
+The watchlist is every ticker seen in an uploaded portfolio over the last
+WATCHLIST_RETENTION_DAYS plus WATCHLIST_TICKERS. Run from the repo root as a
+long-lived process:
+    python prewarm.py
+
+or once (e.g. from cron), optionally with extra tickers:
+    python prewarm.py --once --tickers AAPL MSFT
+
+Each cycle fetches prices and news into the local stores and runs the price
+and news analysis nodes, which put their reports in the shared artifact
+store. Interactive runs then read warm data and only produce the advice and
+summary. Cycles run every PREWARM_INTERVAL_MINUTES while the US market is
+open and once after the close; exchange holidays are not skipped.
+"""
+import time
+import argparse
+import datetime as dt
+from zoneinfo import ZoneInfo
+from config import (
+    WATCHLIST_TICKERS,
+    WATCHLIST_RETENTION_DAYS,
+    PREWARM_INTERVAL_MINUTES,
+    PREWARM_CHUNK,
+    PREWARM_QUOTA_SHARE,
+    FINNHUB_REQUESTS_PER_MINUTE,
+    GROQ_REQUESTS_PER_MINUTE,
+)
+from watchlist import watchlist
+from panel import merge_panels
+import telemetry
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = dt.time(9, 30)
+MARKET_CLOSE = dt.time(16, 0)
+CLOSE_DELAY = dt.timedelta(minutes=20)  # let the final daily bars settle
+
+
+def watchlist_tickers(extra=()) -> list[str]:
+    # Recently uploaded tickers first, then the configured and extra ones
+    tickers = watchlist.tickers(WATCHLIST_RETENTION_DAYS) + list(WATCHLIST_TICKERS) + [t.upper() for t in extra]
+    return list(dict.fromkeys(tickers))
+
+
+def _stock(ticker: str) -> dict:
+    # Minimal StockInfo; the ticker-level nodes only read the ticker
+    return {
+        "ticker": ticker, "shares_held": 0.0, "buy_price": 0.0, "current_price": 0.0,
+        "sector": "", "purchase_date": "",
+        "price_analyst_report": "", "news_analyst_report": "", "recommendation": "",
+    }
+
+
+def min_chunk_seconds(tickers: int) -> float:
+    # Pace chunks so the prewarmer uses at most PREWARM_QUOTA_SHARE of the
+    # per-minute quotas: one Finnhub request and up to two LLM calls (price
+    # and news reports) per ticker. The provider buckets still enforce the
+    # full quota across all processes.
+    share = PREWARM_QUOTA_SHARE / 100
+    seconds = 0.0
+    if FINNHUB_REQUESTS_PER_MINUTE > 0:
+        seconds = max(seconds, 60 * tickers / (FINNHUB_REQUESTS_PER_MINUTE * share))
+    if GROQ_REQUESTS_PER_MINUTE > 0:
+        seconds = max(seconds, 60 * 2 * tickers / (GROQ_REQUESTS_PER_MINUTE * share))
+    return seconds
+
+
+def warm_chunk(tickers: list[str]) -> None:
+    '''
+    # Fetch and analyze one chunk of tickers with the graph's book-level
+    # nodes, so the stored data and reports match what a run would produce.
+    '''
+    from nodes import price_history_node, news_fetch_node, price_analysis_node, news_analysis_node
+
+    state = {"portfolio": [_stock(ticker) for ticker in tickers], "panel": None}
+    for node in (price_history_node, news_fetch_node, price_analysis_node, news_analysis_node):
+        update = node(state)
+        state["portfolio"] = update["portfolio"]
+        if "panel" in update:
+            state["panel"] = merge_panels(state["panel"], update["panel"])
+
+
+def run_cycle(tickers: list[str], chunk_size: int = PREWARM_CHUNK) -> None:
+    started = time.perf_counter()
+    print(f"Pre-warming {len(tickers)} tickers in chunks of {chunk_size}")
+    for i in range(0, len(tickers), chunk_size):
+        chunk = tickers[i:i + chunk_size]
+        chunk_started = time.perf_counter()
+        try:
+            with telemetry.timed("prewarm_chunk", tickers=len(chunk)):
+                warm_chunk(chunk)
+        except Exception as e:
+            print(f"Error pre-warming {', '.join(chunk)} - {e}")
+        if i + chunk_size < len(tickers):
+            time.sleep(max(0.0, min_chunk_seconds(len(chunk)) - (time.perf_counter() - chunk_started)))
+    print(f"Pre-warmed {len(tickers)} tickers in {time.perf_counter() - started:.1f}s")
+    telemetry.flush()
+
+
+def slots(day: dt.date) -> list[dt.datetime]:
+    # Cycle start times on one trading day: intraday every interval, then
+    # once after the close.
+    if day.weekday() >= 5:
+        return []
+    close = dt.datetime.combine(day, MARKET_CLOSE, MARKET_TZ)
+    times = []
+    if PREWARM_INTERVAL_MINUTES > 0:
+        t = dt.datetime.combine(day, MARKET_OPEN, MARKET_TZ)
+        while t < close:
+            times.append(t)
+            t += dt.timedelta(minutes=PREWARM_INTERVAL_MINUTES)
+    return times + [close + CLOSE_DELAY]
+
+
+def next_slot(after: dt.datetime) -> dt.datetime:
+    day = after.astimezone(MARKET_TZ).date()
+    for offset in range(8):
+        for slot in slots(day + dt.timedelta(days=offset)):
+            if slot > after:
+                return slot
+    raise RuntimeError("No pre-warm slot in the next week")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="Run one cycle now and exit")
+    parser.add_argument("--tickers", nargs="*", default=[], help="Extra tickers to warm")
+    parser.add_argument("--chunk", type=int, default=PREWARM_CHUNK, help="Tickers per chunk")
+    args = parser.parse_args()
+
+    if args.once:
+        run_cycle(watchlist_tickers(args.tickers), args.chunk)
+        return
+
+    while True:
+        # Warm right away on start, then on the market schedule
+        run_cycle(watchlist_tickers(args.tickers), args.chunk)
+        wake = next_slot(dt.datetime.now(MARKET_TZ))
+        print(f"Next pre-warm at {wake:%Y-%m-%d %H:%M %Z}")
+        time.sleep(max(0.0, (wake - dt.datetime.now(MARKET_TZ)).total_seconds()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import os
+import json
+from datetime import datetime, timedelta
+import pandas as pd
+from config import CACHE_DIR, PRICE_STORE_MAX_AGE_MINUTES
+import store_io
+
+# Local OHLCV store: one Parquet partition per ticker plus a small JSON
+# sidecar recording which calendar range has already been fetched, so that
+# weekends and holidays are not mistaken for gaps.
+
+PRICE_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+PRICE_STORE_DIR = os.path.join(CACHE_DIR, "prices")
+
+def ticker_lock(ticker: str) -> store_io.TickerLock:
+    # Serializes read-modify-write of one ticker's partition across threads
+    # and processes (e.g. batch workers with overlapping books).
+    return store_io.ticker_lock(PRICE_STORE_DIR, ticker)
+
+
+def _partition_path(ticker: str) -> str:
+    return os.path.join(PRICE_STORE_DIR, f"{store_io.file_name(ticker)}.parquet")
+
+
+def _coverage_path(ticker: str) -> str:
+    return os.path.join(PRICE_STORE_DIR, f"{store_io.file_name(ticker)}.json")
+
+
+def _shift(date_str: str, days: int) -> str:
+    return (datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def read_coverage(ticker: str) -> dict | None:
+    try:
+        with open(_coverage_path(ticker)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def missing_ranges(ticker: str, start: str, end: str) -> list[tuple[str, str]]:
+    '''
+    # Date ranges within [start, end] that still have to be fetched.
+
+    # Args:
+    #     ticker (str): Stock ticker symbol.
+    #     start (str): First day of the requested window, YYYY-MM-DD.
+    #     end (str): Last day of the requested window, YYYY-MM-DD.
+
+    # Returns:
+    #     list[tuple[str, str]]: Inclusive (start, end) ranges, at most one
+    #     before and one after the stored coverage.
+    '''
+    coverage = read_coverage(ticker)
+    if coverage is None or not os.path.exists(_partition_path(ticker)):
+        return [(start, end)]
+
+    ranges = []
+    if start < coverage["start"]:
+        ranges.append((start, _shift(coverage["start"], -1)))
+
+    covered_end = coverage["end"]
+    fetched_at = datetime.fromisoformat(coverage["fetched_at"])
+    fetched_on = fetched_at.strftime("%Y-%m-%d")
+    if covered_end >= fetched_on and datetime.now() - fetched_at > timedelta(minutes=PRICE_STORE_MAX_AGE_MINUTES):
+        # The last fetch covered a session that may still have been open.
+        covered_end = _shift(fetched_on, -1)
+    if end > covered_end:
+        ranges.append((max(start, _shift(covered_end, 1)), end))
+
+    return ranges
+
+
+def append(ticker: str, prices: pd.DataFrame, start: str, end: str) -> None:
+    '''
+    # Merge freshly fetched rows into the ticker's partition and extend its
+    # coverage to include [start, end], even when the provider returned no rows.
+    # Callers hold ticker_lock(ticker).
+    '''
+    os.makedirs(PRICE_STORE_DIR, exist_ok=True)
+    path = _partition_path(ticker)
+
+    frames = [prices[PRICE_COLUMNS]] if not prices.empty else []
+    if os.path.exists(path):
+        frames.insert(0, pd.read_parquet(path, columns=PRICE_COLUMNS))
+    if frames:
+        merged = (
+            pd.concat(frames, ignore_index=True)
+            .drop_duplicates(subset="date", keep="last")
+            .sort_values("date", ignore_index=True)
+        )
+        with store_io.atomic_write(path) as tmp_path:
+            merged.to_parquet(tmp_path, index=False)
+
+    coverage = read_coverage(ticker)
+    if coverage is not None:
+        start = min(start, coverage["start"])
+        end = max(end, coverage["end"])
+    with store_io.atomic_write(_coverage_path(ticker)) as tmp_path, open(tmp_path, "w") as f:
+        json.dump({"start": start, "end": end, "fetched_at": datetime.now().isoformat()}, f)
+
+
+def read(ticker: str, start: str, end: str, columns: list[str] = PRICE_COLUMNS) -> pd.DataFrame:
+    # Only the requested columns and row groups in [start, end] are loaded.
+    path = _partition_path(ticker)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns)
+    df = pd.read_parquet(
+        path,
+        columns=columns,
+        filters=[("date", ">=", start), ("date", "<=", end)],
+    )
+    return df.reset_index(drop=True)
@@ -0,0 +1,243 @@
+import os
+import re
+import time
+import random
+import sqlite3
+import threading
+import telemetry
+from config import (
+    CACHE_DIR,
+    OPENBB_MAX_CONCURRENCY,
+    FINNHUB_MAX_CONCURRENCY,
+    LLM_MAX_CONCURRENCY,
+    OPENBB_REQUESTS_PER_MINUTE,
+    FINNHUB_REQUESTS_PER_MINUTE,
+    GROQ_REQUESTS_PER_MINUTE,
+    PROVIDER_MAX_RETRIES,
+    PROVIDER_BACKOFF_SECONDS,
+    PROVIDER_BREAKER_FAILURES,
+    PROVIDER_BREAKER_COOLDOWN_SECONDS,
+)
+
+# Every OpenBB, Finnhub and Groq request goes through call(provider, ...):
+#   1. a circuit breaker fails fast while the provider is known to be down,
+#   2. a token bucket, stored in SQLite so that threads and worker processes
+#      share one quota, paces requests to the provider's per-minute limit,
+#   3. a semaphore caps requests in flight,
+#   4. 429 / 5xx / connection errors are retried with jittered exponential
+#      backoff (honouring Retry-After when the provider sends it).
+
+RATE_LIMITS = {
+    "openbb": OPENBB_REQUESTS_PER_MINUTE,
+    "finnhub": FINNHUB_REQUESTS_PER_MINUTE,
+    "groq": GROQ_REQUESTS_PER_MINUTE,
+}
+
+# One slot pool per provider, shared by every thread calling into it.
+provider_slots = {
+    "openbb": threading.BoundedSemaphore(OPENBB_MAX_CONCURRENCY),
+    "finnhub": threading.BoundedSemaphore(FINNHUB_MAX_CONCURRENCY),
+    "groq": threading.BoundedSemaphore(LLM_MAX_CONCURRENCY),
+}
+
+MAX_BACKOFF_SECONDS = 60.0
+# Fallback for errors that carry no status attribute: the code only counts
+# next to "status" or "HTTP", so a 5xx-looking number elsewhere in the
+# message (a price, a symbol, a body excerpt) does not trigger a retry.
+RETRYABLE_STATUS = re.compile(
+    r"\b(?:status(?:[ _]code)?|HTTP(?:/[\d.]+)?(?: error)?)\W{0,3}(?:429|5\d\d)\b|too many requests|rate limit",
+    re.IGNORECASE,
+)
+
+
+class ProviderUnavailableError(RuntimeError):
+    # Raised without calling the provider while its circuit is open.
+    pass
+
+
+class TokenBucket:
+    '''
+    # Per-minute request quota shared across threads and processes. The
+    # bucket state lives in one SQLite row per provider and is updated in a
+    # write transaction, so concurrent workers never overdraw it.
+    '''
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " provider TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+        return self._conn
+
+    def _take(self, provider: str, per_minute: int, amount: float) -> float:
+        # Take `amount` tokens if available; otherwise return the seconds to
+        # wait. A request larger than the bucket only waits for a full one.
+        capacity = float(per_minute)
+        amount = min(float(amount), capacity)
+        rate = per_minute / 60.0
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE provider = ?", (provider,)).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+                wait = 0.0 if tokens >= amount else (amount - tokens) / rate
+                if not wait:
+                    tokens -= amount
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (provider, tokens, updated) VALUES (?, ?, ?)",
+                    (provider, tokens, now),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def acquire(self, provider: str, per_minute: int, amount: float = 1.0) -> None:
+        # amount > 1 meters something other than requests, e.g. LLM prompt
+        # tokens under the "groq_tokens" bucket.
+        if per_minute <= 0:
+            return
+        while True:
+            wait = self._take(provider, per_minute, amount)
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    '''
+    # Opens after `failures` consecutive failed calls (retries exhausted) and
+    # rejects calls for `cooldown` seconds; then one trial call is let
+    # through, which closes the circuit again on success.
+    '''
+
+    def __init__(self, failures: int, cooldown: float):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._consecutive = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def before_call(self, provider: str) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.cooldown or self._trial:
+                raise ProviderUnavailableError(f"{provider} circuit open after {self._consecutive} failures")
+            self._trial = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive += 1
+            self._trial = False
+            if self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+
+
+rate_limiter = TokenBucket(os.path.join(CACHE_DIR, "rate_limits.sqlite"))
+breakers = {
+    provider: CircuitBreaker(PROVIDER_BREAKER_FAILURES, PROVIDER_BREAKER_COOLDOWN_SECONDS)
+    for provider in RATE_LIMITS
+}
+
+
+def _status_code(error: Exception) -> int | None:
+    for source in (error, getattr(error, "response", None)):
+        status = getattr(source, "status_code", None) or getattr(source, "status", None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    # Rate limits, server errors and dropped connections are worth another
+    # try; anything else (bad symbol, bad key) fails straight away.
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or 500 <= status < 600
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return bool(RETRYABLE_STATUS.search(str(error)))
+
+
+def _retry_after(error: Exception) -> float | None:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, error: Exception | None = None) -> float:
+    # Full jitter: uniform over [0, base * 2^attempt], capped
+    retry_after = _retry_after(error) if error is not None else None
+    if retry_after is not None:
+        return min(retry_after, MAX_BACKOFF_SECONDS)
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, PROVIDER_BACKOFF_SECONDS * 2 ** attempt))
+
+
+def call(provider: str, func, *args, **kwargs):
+    '''
+    # Call a provider API through the rate limiter, retry and breaker.
+
+    # Args:
+    #     provider (str): "openbb", "finnhub" or "groq".
+    #     func: The client call, e.g. get_finnhub_client().company_news.
+    #     *args, **kwargs: Passed to func.
+
+    # Returns:
+    #     Whatever func returns.
+
+    # Raises:
+    #     ProviderUnavailableError: While the provider's circuit is open.
+    #     Exception: The provider's own error, when it is not retryable or
+    #     the retries are exhausted.
+    '''
+    breaker = breakers[provider]
+    try:
+        breaker.before_call(provider)
+    except ProviderUnavailableError:
+        telemetry.count("provider_rejected_total", provider=provider)
+        raise
+    for attempt in range(PROVIDER_MAX_RETRIES + 1):
+        with telemetry.timed("provider_wait", {"provider": provider}):
+            rate_limiter.acquire(provider, RATE_LIMITS[provider])
+        try:
+            with provider_slots[provider], telemetry.timed("provider_request", {"provider": provider}, attempt=attempt):
+                result = func(*args, **kwargs)
+        except Exception as e:
+            if not is_retryable(e):
+                # The provider answered; the request itself was bad
+                breaker.record_success()
+                raise
+            if attempt == PROVIDER_MAX_RETRIES:
+                breaker.record_failure()
+                raise
+            delay = backoff_delay(attempt, e)
+            telemetry.count("provider_retries_total", provider=provider)
+            telemetry.log.warning(
+                "%s request failed (%s); retry %d/%d in %.1fs", provider, e, attempt + 1, PROVIDER_MAX_RETRIES, delay
+            )
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
@@ -0,0 +1,195 @@
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+
+# Portfolio risk from the daily price histories the graph already fetches.
+# All holdings are aligned into one (date x ticker) return matrix and every
+# metric is a NumPy matrix/vector operation on it, so the cost grows with
+# the matrix size rather than with per-ticker Python loops.
+
+TRADING_DAYS = 252
+VAR_CONFIDENCE = 0.95
+TOP_POSITIONS = 5
+
+
+def close_matrix(frames: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    '''
+    # Align many price frames into one wide table of closes.
+
+    # Args:
+    #     frames (dict[str, pd.DataFrame]): Ticker -> frame with date and
+    #         close. Empty frames are skipped.
+
+    # Returns:
+    #     pd.DataFrame: Dates as rows (sorted), tickers as columns.
+    '''
+    frames = {ticker: df for ticker, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        return pd.DataFrame()
+    long = pd.concat(
+        {ticker: df[["date", "close"]] for ticker, df in frames.items()}, names=["ticker", None]
+    ).reset_index(level=0)
+    closes = long.pivot_table(index="date", columns="ticker", values="close", aggfunc="last")
+    return closes.sort_index().astype("float64")
+
+
+def _returns(closes: pd.DataFrame) -> np.ndarray:
+    # Simple daily returns; a ticker with no quote on a date (not yet
+    # listed, holiday on its exchange) contributes a zero return that day.
+    values = closes.to_numpy(dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = values[1:] / values[:-1] - 1.0
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def _max_drawdown(returns: np.ndarray) -> float:
+    wealth = np.cumprod(1.0 + returns)
+    peak = np.maximum.accumulate(np.concatenate(([1.0], wealth)))[1:]
+    return float((wealth / peak - 1.0).min()) if len(wealth) else 0.0
+
+
+def compute_portfolio_risk(
+    closes: pd.DataFrame,
+    values: dict[str, float],
+    sectors: dict[str, str] | None = None,
+    benchmark: pd.Series | None = None,
+    confidence: float = VAR_CONFIDENCE,
+) -> dict:
+    '''
+    # Weighted risk metrics for a portfolio.
+
+    # Args:
+    #     closes (pd.DataFrame): Date x ticker closes (see close_matrix).
+    #     values (dict[str, float]): Ticker -> current market value.
+    #     sectors (dict[str, str]): Ticker -> sector, for sector concentration.
+    #     benchmark (pd.Series): Benchmark closes indexed by date, for beta.
+    #     confidence (float): VaR/CVaR confidence level.
+
+    # Returns:
+    #     dict: Daily and annualized volatility, historical and parametric
+    #     VaR/CVaR (as positive fractions of portfolio value), beta, max
+    #     drawdown, concentration (HHI, effective positions, top weights)
+    #     and the largest contributors to portfolio variance. Empty when
+    #     there is not enough price history.
+    '''
+    total_value = sum(v for v in values.values() if v > 0)
+    tickers = [t for t in closes.columns if values.get(t, 0) > 0]
+    if closes.empty or not tickers or total_value <= 0 or len(closes) < 3:
+        return {}
+
+    closes = closes[tickers]
+    returns = _returns(closes)                                       # T x N
+    market_values = np.array([values[t] for t in tickers], dtype="float64")
+    weights = market_values / market_values.sum()                    # N, over covered holdings
+    coverage = market_values.sum() / total_value
+
+    # Covariance and portfolio variance: w' S w
+    centered = returns - returns.mean(axis=0)
+    cov = centered.T @ centered / (len(returns) - 1)                 # N x N
+    cov_w = cov @ weights
+    variance = float(weights @ cov_w)
+    daily_vol = np.sqrt(max(variance, 0.0))
+
+    portfolio_returns = returns @ weights                            # T
+    mean = float(portfolio_returns.mean())
+
+    # Historical VaR/CVaR from the realized portfolio return series
+    cutoff = np.quantile(portfolio_returns, 1.0 - confidence)
+    tail = portfolio_returns[portfolio_returns <= cutoff]
+    hist_var = -float(cutoff)
+    hist_cvar = -float(tail.mean()) if len(tail) else hist_var
+
+    # Parametric (normal) VaR/CVaR
+    z = NormalDist().inv_cdf(confidence)
+    param_var = z * daily_vol - mean
+    param_cvar = daily_vol * NormalDist().pdf(z) / (1.0 - confidence) - mean
+
+    # Share of portfolio variance from each holding
+    contributions = weights * cov_w / variance if variance > 0 else np.zeros_like(weights)
+    top_risk = np.argsort(contributions)[::-1][:TOP_POSITIONS]
+
+    # Concentration over all holdings, including those without history
+    all_weights = np.array([v for v in values.values() if v > 0], dtype="float64") / total_value
+    hhi = float(np.square(all_weights).sum())
+    ranked = sorted(((v / total_value, t) for t, v in values.items() if v > 0), reverse=True)
+
+    risk = {
+        "observations": len(returns),
+        "holdings_covered": len(tickers),
+        "value_covered": float(coverage),
+        "daily_volatility": daily_vol,
+        "annual_volatility": daily_vol * np.sqrt(TRADING_DAYS),
+        "confidence": confidence,
+        "historical_var": hist_var,
+        "historical_cvar": hist_cvar,
+        "parametric_var": float(param_var),
+        "parametric_cvar": float(param_cvar),
+        "max_drawdown": _max_drawdown(portfolio_returns),
+        "hhi": hhi,
+        "effective_positions": 1.0 / hhi if hhi else 0.0,
+        "largest_position": {"ticker": ranked[0][1], "weight": ranked[0][0]},
+        "top_weight": sum(w for w, _ in ranked[:TOP_POSITIONS]),
+        "risk_contributors": [
+            {"ticker": tickers[i], "weight": float(weights[i]), "risk_share": float(contributions[i])}
+            for i in top_risk
+        ],
+        "beta": None,
+    }
+
+    if sectors:
+        sector_values = pd.Series(values).groupby(pd.Series(sectors)).sum()
+        sector_weights = sector_values[sector_values > 0] / total_value
+        risk["sector_hhi"] = float(np.square(sector_weights.to_numpy()).sum())
+
+    if benchmark is not None and not benchmark.empty:
+        aligned = benchmark.reindex(closes.index).astype("float64").ffill()
+        bench = _returns(aligned.to_frame())[:, 0]
+        bench_var = bench.var(ddof=1)
+        if bench_var > 0:
+            # Per-holding betas in one product, then the weighted sum
+            betas = (centered.T @ (bench - bench.mean())) / (len(bench) - 1) / bench_var
+            risk["beta"] = float(weights @ betas)
+
+    return risk
+
+
+def risk_score(risk: dict) -> float:
+    # 0-100 headline number: annualized volatility in percent, capped.
+    if not risk:
+        return 0.0
+    return round(min(risk["annual_volatility"] * 100, 100.0), 2)
+
+
+def _pct(value) -> str:
+    return "n/a" if value is None else f"{value * 100:.2f}%"
+
+
+def format_risk_block(risk: dict) -> str:
+    '''
+    # Render the risk metrics as a compact text block for the summary prompt.
+    '''
+    if not risk:
+        return "Risk metrics unavailable (not enough price history)"
+
+    level = int(risk["confidence"] * 100)
+    contributors = ", ".join(
+        f"{c['ticker']} ({_pct(c['weight'])} of value, {_pct(c['risk_share'])} of risk)"
+        for c in risk["risk_contributors"]
+    )
+    beta = "n/a" if risk["beta"] is None else f"{risk['beta']:.2f}"
+    lines = [
+        f"history: {risk['observations']} daily returns, {risk['holdings_covered']} holdings "
+        f"({_pct(risk['value_covered'])} of value)",
+        f"volatility: {_pct(risk['daily_volatility'])} daily, {_pct(risk['annual_volatility'])} annualized",
+        f"1-day {level}% VaR: {_pct(risk['historical_var'])} historical, {_pct(risk['parametric_var'])} parametric",
+        f"1-day {level}% CVaR: {_pct(risk['historical_cvar'])} historical, {_pct(risk['parametric_cvar'])} parametric",
+        f"max drawdown in window: {_pct(risk['max_drawdown'])}",
+        f"beta vs benchmark: {beta}",
+        f"concentration: HHI {risk['hhi']:.3f} (~{risk['effective_positions']:.1f} effective positions); "
+        f"largest {risk['largest_position']['ticker']} {_pct(risk['largest_position']['weight'])}; "
+        f"top {TOP_POSITIONS} {_pct(risk['top_weight'])}",
+        f"largest risk contributors: {contributors}",
+    ]
+    if "sector_hhi" in risk:
+        lines.append(f"sector HHI: {risk['sector_hhi']:.3f}")
+    return "\n".join(lines)
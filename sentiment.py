@@ -0,0 +1,194 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+from config import CACHE_DIR, NEWS_STORE_RETENTION_DAYS, SENTIMENT_ESCALATION_THRESHOLD
+from cache import DiskCache
+from memo import digest
+import telemetry
+
+# Local headline sentiment. Every headline in the book is scored in one
+# vectorized pass against a small finance lexicon; the per-ticker aggregates
+# decide whether a ticker's news is worth an LLM analysis at all. Quiet,
+# one-sided coverage gets a templated report instead.
+
+POSITIVE = {
+    "beat", "beats", "beating", "surge", "surges", "surged", "soar", "soars", "soared",
+    "jump", "jumps", "jumped", "rally", "rallies", "rallied", "gain", "gains", "gained",
+    "rise", "rises", "rising", "rose", "climb", "climbs", "climbed", "record", "strong",
+    "stronger", "upgrade", "upgrades", "upgraded", "outperform", "outperforms", "buy",
+    "raise", "raises", "raised", "boost", "boosts", "boosted", "growth", "grows", "grew",
+    "profit", "profits", "profitable", "win", "wins", "won", "approval", "approved",
+    "expands", "expansion", "partnership", "dividend", "buyback", "exceeds", "exceeded",
+    "tops", "topped", "rebound", "rebounds", "optimism", "optimistic", "bullish", "breakthrough",
+}
+NEGATIVE = {
+    "miss", "misses", "missed", "plunge", "plunges", "plunged", "tumble", "tumbles", "tumbled",
+    "fall", "falls", "fell", "drop", "drops", "dropped", "slide", "slides", "slid", "sink",
+    "sinks", "sank", "slump", "slumps", "weak", "weaker", "downgrade", "downgrades",
+    "downgraded", "underperform", "sell", "cut", "cuts", "cutting", "loss", "losses", "lose",
+    "decline", "declines", "declined", "lawsuit", "sued", "probe", "investigation", "fraud",
+    "recall", "recalls", "layoffs", "layoff", "bankruptcy", "default", "warning", "warns",
+    "warned", "halt", "halts", "halted", "fine", "fined", "penalty", "delay", "delays",
+    "delayed", "concern", "concerns", "risk", "risks", "bearish", "crash", "crashes", "scandal",
+    "resigns", "resignation", "shortfall", "downturn", "volatile",
+}
+NEGATORS = {"no", "not", "never", "without", "despite", "fails", "failed"}
+LEXICON = {**{w: 1.0 for w in POSITIVE}, **{w: -1.0 for w in NEGATIVE}}
+
+_TOKEN = re.compile(r"[a-z]+")
+NEUTRAL_BAND = 0.1      # |headline score| below this counts as neutral
+MIXED_SHARE = 0.25      # both sides above this share of stories = mixed signal
+RECENT_DAYS = 2         # trend compares the last two days with the rest of the window
+
+sentiment_store = DiskCache(
+    os.path.join(CACHE_DIR, "sentiment.sqlite"),
+    max_bytes=32 * 1024 * 1024,
+    ttl_seconds=NEWS_STORE_RETENTION_DAYS * 86400,
+)
+
+
+def score_headlines(headlines: pd.Series) -> pd.Series:
+    '''
+    # Lexicon score per headline in [-1, 1]: (positive - negative) hits over
+    # all hits, with a hit flipped when the word before it is a negator.
+    '''
+    tokens = headlines.fillna("").astype(str).str.lower().str.findall(_TOKEN).explode()
+    values = tokens.map(LEXICON).fillna(0.0)
+    negated = tokens.groupby(level=0).shift(1).isin(NEGATORS)
+    values = values.where(~negated, -values)
+    hits = values.abs().groupby(level=0).sum()
+    return (values.groupby(level=0).sum() / hits.where(hits > 0)).fillna(0.0).reindex(headlines.index, fill_value=0.0)
+
+
+def score_book(news: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    '''
+    # Score every headline in the book in one pass and aggregate per ticker.
+
+    # Args:
+    #     news (dict[str, pd.DataFrame]): ticker -> news frame (datetime,
+    #         headline, optionally source_count).
+
+    # Returns:
+    #     pd.DataFrame: Indexed by ticker with stories, positive, negative,
+    #     neutral (shares of stories), mean (coverage-weighted score),
+    #     dispersion (weighted std) and trend (recent minus older mean; 0
+    #     when the window has no older stories).
+    '''
+    frames = {ticker: df for ticker, df in news.items() if not df.empty}
+    if not frames:
+        return pd.DataFrame(columns=["stories", "positive", "negative", "neutral", "mean", "dispersion", "trend"])
+
+    long = pd.concat(
+        [df[["datetime", "headline"]].assign(
+            ticker=ticker,
+            weight=df["source_count"] if "source_count" in df else 1,
+        ) for ticker, df in frames.items()],
+        ignore_index=True,
+    )
+    long["score"] = score_headlines(long["headline"])
+    long["weighted"] = long["score"] * long["weight"]
+    long["positive"] = long["score"] >= NEUTRAL_BAND
+    long["negative"] = long["score"] <= -NEUTRAL_BAND
+    cutoff = long.groupby("ticker")["datetime"].transform("max") - pd.Timedelta(days=RECENT_DAYS)
+    long["recent"] = long["datetime"] > cutoff
+
+    grouped = long.groupby("ticker")
+    weight = grouped["weight"].sum()
+    mean = grouped["weighted"].sum() / weight
+    long["sq_dev"] = long["weight"] * (long["score"] - long["ticker"].map(mean)) ** 2
+
+    by_window = long.groupby(["ticker", "recent"])
+    window_mean = (by_window["weighted"].sum() / by_window["weight"].sum()).unstack()
+    trend = (window_mean.get(True) - window_mean.get(False)) if False in window_mean else pd.Series(0.0, index=mean.index)
+
+    stories = grouped.size()
+    return pd.DataFrame({
+        "stories": stories,
+        "positive": grouped["positive"].sum() / stories,
+        "negative": grouped["negative"].sum() / stories,
+        "neutral": 1 - (grouped["positive"].sum() + grouped["negative"].sum()) / stories,
+        "mean": mean,
+        "dispersion": np.sqrt(grouped["sq_dev"].sum() / weight),
+        "trend": trend.reindex(mean.index).fillna(0.0),
+    })
+
+
+def label(mean: float) -> str:
+    if mean >= 0.5:
+        return "positive"
+    if mean >= NEUTRAL_BAND:
+        return "mildly positive"
+    if mean <= -0.5:
+        return "negative"
+    if mean <= -NEUTRAL_BAND:
+        return "mildly negative"
+    return "neutral"
+
+
+def escalation_reason(row: pd.Series, previous: float | None, threshold: float) -> str | None:
+    # Why this ticker needs the LLM, or None when the local read is enough
+    if abs(row["mean"]) >= threshold:
+        return "strong"
+    if row["positive"] >= MIXED_SHARE and row["negative"] >= MIXED_SHARE:
+        return "mixed"
+    if abs(row["trend"]) >= threshold:
+        return "trend"
+    if previous is not None and abs(row["mean"] - previous) >= threshold / 2:
+        return "changed"
+    return None
+
+
+def _previous_mean(ticker: str, news_digest: str, mean: float) -> float | None:
+    # Mean from the last run that saw different news. Re-running on the same
+    # news compares against the same baseline, so the decision is stable.
+    key = f"sentiment:{ticker}"
+    last = sentiment_store.get(key)
+    if last is not None and last["digest"] == news_digest:
+        return last["baseline"]
+    baseline = last["mean"] if last is not None else None
+    sentiment_store.put(key, {"digest": news_digest, "mean": mean, "baseline": baseline})
+    return baseline
+
+
+def local_report(ticker: str, row: pd.Series, news: pd.DataFrame) -> str:
+    top = "\n".join(f"        - {h}" for h in news["headline"].head(3))
+    return (
+        f"Local sentiment screen for {ticker} (not escalated to LLM analysis):\n"
+        f"- Overall sentiment: {label(row['mean'])} (coverage-weighted score {row['mean']:+.2f} on a -1 to +1 scale).\n"
+        f"- Mix: {row['stories']:.0f} stories, {row['positive']:.0%} positive, "
+        f"{row['negative']:.0%} negative, {row['neutral']:.0%} neutral (dispersion {row['dispersion']:.2f}).\n"
+        f"- Trend: last {RECENT_DAYS} days vs. earlier {row['trend']:+.2f}; no material change since the previous run.\n"
+        f"- Most covered headlines:\n{top}\n"
+        f"- Conclusion: coverage is quiet or one-sided with no strong signal; news is unlikely to be a major driver near term."
+    )
+
+
+def screen_news(news: dict[str, pd.DataFrame], threshold: float | None = None) -> dict[str, str]:
+    '''
+    # Templated news reports for the tickers that do not need the LLM.
+
+    # Args:
+    #     news (dict[str, pd.DataFrame]): ticker -> news frame, whole book.
+    #     threshold (float | None): Score (0-1) that counts as strong, and
+    #         twice the run-over-run change that counts as changed. Defaults
+    #         to SENTIMENT_ESCALATION_THRESHOLD; 0 escalates every ticker.
+
+    # Returns:
+    #     dict[str, str]: ticker -> local report. Tickers with news that are
+    #     missing from the result should go to the LLM.
+    '''
+    threshold = SENTIMENT_ESCALATION_THRESHOLD / 100 if threshold is None else threshold
+    if not threshold:
+        return {}
+
+    scores = score_book(news)
+    reports = {}
+    for ticker, row in scores.iterrows():
+        previous = _previous_mean(ticker, digest(news[ticker]), float(row["mean"]))
+        reason = escalation_reason(row, previous, threshold)
+        telemetry.count("sentiment_screen_total", outcome=reason or "local")
+        if reason is None:
+            reports[ticker] = local_report(ticker, row, news[ticker])
+    telemetry.log.debug("Sentiment screen: %d of %d tickers handled locally", len(reports), len(scores))
+    return reports
@@ -0,0 +1,136 @@
+import math
+import re
+import pandas as pd
+
+# Compact, token-budgeted text encodings of the price and news frames for
+# LLM prompts. Token counts are estimates (no tokenizer dependency): one
+# token per word piece or punctuation mark, which tracks Llama-family
+# tokenizers closely for numeric tables and short headlines.
+
+_TOKEN_PATTERN = re.compile(r"\d{1,3}|[A-Za-z]+|[^\sA-Za-z\d]")
+
+# Outlets whose headlines are ranked ahead of the long tail of aggregators.
+MAJOR_SOURCES = {
+    "reuters", "bloomberg", "cnbc", "wsj", "the wall street journal", "financial times",
+    "marketwatch", "barron's", "associated press", "yahoo", "seekingalpha", "forbes",
+}
+
+# (daily rows kept, resample rule for older rows) tried in order until the
+# encoded table fits the budget. None means older rows are dropped.
+_PRICE_LEVELS = [(None, None), (20, "W-FRI"), (10, "W-FRI"), (10, "MS"), (5, "MS"), (5, None)]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def _format_volume(volume: float) -> str:
+    if volume >= 1e6:
+        return f"{volume / 1e6:.1f}M"
+    if volume >= 1e3:
+        return f"{volume / 1e3:.0f}k"
+    return f"{volume:.0f}"
+
+
+def _resample(prices: pd.DataFrame, rule: str) -> pd.DataFrame:
+    bars = prices.assign(date=pd.to_datetime(prices["date"])).set_index("date")
+    bars = bars.resample(rule).agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    ).dropna(subset=["close"])
+    return bars.reset_index().assign(date=lambda df: df["date"].dt.strftime("%Y-%m-%d"))
+
+
+def _render_rows(rows: pd.DataFrame, label: str) -> list[str]:
+    lines = [f"{label} (date,open,high,low,close,volume):"]
+    lines.extend(
+        f"{r.date},{r.open:.2f},{r.high:.2f},{r.low:.2f},{r.close:.2f},{_format_volume(r.volume)}"
+        for r in rows.itertuples(index=False)
+    )
+    return lines
+
+
+def encode_prices(prices: pd.DataFrame, token_budget: int) -> tuple[str, int]:
+    '''
+    # Encode a daily OHLCV frame into at most `token_budget` tokens.
+
+    # Recent sessions are kept as daily bars; older ones are rolled up into
+    # weekly then monthly bars, and dropped as a last resort.
+
+    # Args:
+    #     prices (pd.DataFrame): date, open, high, low, close, volume.
+    #     token_budget (int): Maximum estimated tokens for the encoded table.
+
+    # Returns:
+    #     tuple[str, int]: Encoded table and its estimated token count.
+    '''
+    if prices.empty:
+        return "No price data available", 0
+
+    prices = prices.sort_values("date", ignore_index=True)
+    for recent_days, older_rule in _PRICE_LEVELS:
+        recent = prices if recent_days is None else prices.tail(recent_days)
+        older = prices.iloc[: len(prices) - len(recent)]
+        lines = []
+        if older_rule is not None and not older.empty:
+            rule_label = "weekly bars" if older_rule.startswith("W") else "monthly bars"
+            lines += _render_rows(_resample(older, older_rule), f"Older {rule_label}")
+        lines += _render_rows(recent, "Daily bars")
+        text = "\n".join(lines)
+        tokens = estimate_tokens(text)
+        if tokens <= token_budget:
+            return text, tokens
+
+    # Even the smallest level is over budget: keep the newest rows that fit.
+    header, rows = lines[0], lines[1:]
+    while rows and estimate_tokens("\n".join([header] + rows)) > token_budget:
+        rows = rows[1:]
+    text = "\n".join([header] + rows)
+    return text, estimate_tokens(text)
+
+
+def rank_headlines(news: pd.DataFrame) -> pd.Series:
+    # Importance score: recency decays with a 2-day half life, major outlets
+    # and widely covered stories (source_count, when present) rank higher.
+    age_days = (news["datetime"].max() - news["datetime"]).dt.total_seconds() / 86400
+    score = 0.5 ** (age_days / 2.0)
+    score = score + news["source"].str.lower().isin(MAJOR_SOURCES).astype(float) * 0.5
+    if "source_count" in news:
+        score = score + news["source_count"].map(lambda n: math.log2(max(n, 1))) * 0.5
+    return score
+
+
+def encode_news(news: pd.DataFrame, token_budget: int) -> tuple[str, int]:
+    '''
+    # Encode a news frame into at most `token_budget` tokens.
+
+    # Headlines are picked by importance (rank_headlines) until the budget is
+    # spent, then listed newest first. URLs are left out.
+
+    # Args:
+    #     news (pd.DataFrame): datetime, headline, source[, source_count].
+    #     token_budget (int): Maximum estimated tokens for the encoded list.
+
+    # Returns:
+    #     tuple[str, int]: Encoded headlines and their estimated token count.
+    '''
+    if news.empty:
+        return "No news data available", 0
+
+    ranked = news.assign(_score=rank_headlines(news)).sort_values("_score", ascending=False)
+    chosen, used = [], 0
+    for row in ranked.itertuples(index=False):
+        coverage = f" [{row.source_count} sources]" if getattr(row, "source_count", 1) > 1 else ""
+        line = f"{row.datetime:%Y-%m-%d %H:%M} | {row.source}{coverage} | {row.headline}"
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            continue
+        chosen.append((row.datetime, line))
+        used += cost
+
+    chosen.sort(key=lambda item: item[0], reverse=True)
+    omitted = len(news) - len(chosen)
+    lines = [line for _, line in chosen]
+    if omitted:
+        lines.append(f"({omitted} lower-ranked headlines omitted)")
+    text = "\n".join(lines)
+    return text, estimate_tokens(text)
@@ -1,7 +1,8 @@
-from typing import TypedDict, Annotated
+from typing import TypedDict, Annotated, NotRequired
 import pandas as pd
 import operator
 from langchain_core.messages import AnyMessage  # if you're using LangGraph
+from panel import PortfolioPanel, merge_panels
 
 class StockInfo(TypedDict):
     ticker: str
@@ -10,11 +11,53 @@ class StockInfo(TypedDict):
     current_price: float
     sector: str
     purchase_date: str
+    prices: NotRequired[pd.DataFrame]  # set by the price fetch
+    news: NotRequired[pd.DataFrame]    # set by the news fetch
+    price_analyst_report: str
+    news_analyst_report: str
+    recommendation: str  # "Buy", "Hold", "Sell", etc.
+
+def merge_portfolio(current: list[StockInfo], update: list[StockInfo]) -> list[StockInfo]:
+    # Reducer for AppState.portfolio. A per-ticker branch hands back its one
+    # stock tagged with its "position" in the book (the index it was sent
+    # with), which puts it back in place even when a ticker repeats. Other
+    # updates replace the entry with the same ticker (repeated tickers are
+    # matched in order), so the portfolio keeps its original order. Unknown
+    # tickers are appended.
+    merged = list(current)
+    pending = {}
+    for stock in update:
+        if "position" in stock:
+            stock = dict(stock)
+            position = stock.pop("position")
+            if position < len(merged):
+                merged[position] = stock
+            else:
+                merged.append(stock)
+            continue
+        pending.setdefault(stock["ticker"], []).append(stock)
+
+    merged = [
+        pending[stock["ticker"]].pop(0) if pending.get(stock["ticker"]) else stock
+        for stock in merged
+    ]
+    merged.extend(stock for stocks in pending.values() for stock in stocks)
+    return merged
+
+class TickerState(TypedDict):
+    # State of the per-ticker fetch -> analyze -> advise subgraph
+    stock: StockInfo
+    position: int  # index of the stock in AppState.portfolio
+    risk_tolerance: str
+    investment_horizon: str
+    objective: str
+    liquidity_needs: str
     prices: pd.DataFrame
     news: pd.DataFrame
+    local_news_report: str  # from the book-level sentiment screen; "" = analyze with the LLM
     price_analyst_report: str
     news_analyst_report: str
-    recommendation: str  # "Buy", "Hold", "Sell", etc.
+    recommendation: str
 
 class PortfolioSummary(TypedDict):
     total_investment: float
@@ -27,12 +70,17 @@ class PortfolioSummary(TypedDict):
 
 class AppState(TypedDict):
     user_uploaded_file: str  # file name or ID
+    holdings: pd.DataFrame   # validated upload (read_portfolio output); used instead of user_uploaded_file when present
     risk_tolerance: str      # "Low", "Medium", "High"
     investment_horizon: str  # "Short-term", "Medium-term", "Long-term"
     objective: str  # "Growth", "Income", "Balanced"
     liquidity_needs: str  # "High", "Medium", "Low"
     suggestions: list
-    portfolio: list[StockInfo]
+    news_screen: dict[str, str]  # ticker -> local news report for tickers the sentiment screen kept off the LLM
+    portfolio: Annotated[list[StockInfo], merge_portfolio]
+    # Prices/news for all tickers when PANEL_STATE is on. Optional, so the
+    # channel starts empty (None) rather than as an empty PortfolioPanel().
+    panel: Annotated[PortfolioPanel | None, merge_panels]
     summary: PortfolioSummary
     # final_response: Annotated[list[AnyMessage], operator.add]
     # messages: Annotated[list[AnyMessage], operator.add]
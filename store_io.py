@@ -0,0 +1,88 @@
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks then only hold within one process
+    fcntl = None
+
+# File helpers shared by the per-ticker stores (price_store, news_store).
+# Batch workers are separate processes writing the same cache directory, so
+# a ticker's read-merge-write is guarded by a lock file as well as a thread
+# lock, and every write goes to a uniquely named temp file that is then
+# renamed over the target.
+
+
+def file_name(ticker: str) -> str:
+    # Ticker as a single path component: separators are percent-encoded,
+    # so a symbol can never name a file outside its store directory.
+    return quote(str(ticker), safe="^=")
+
+
+class TickerLock:
+    '''
+    # Exclusive lock on one ticker's files, held across the threads of this
+    # process (threading.Lock) and across processes (flock on a lock file).
+    # Not reentrant.
+    '''
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if fcntl is None:
+            return self
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        except Exception:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+                os.close(self._fd)
+                self._fd = None
+        finally:
+            self._thread_lock.release()
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def ticker_lock(store_dir: str, name: str) -> TickerLock:
+    # One lock object per file, so threads queue on the same thread lock
+    path = os.path.join(store_dir, ".locks", f"{file_name(name)}.lock")
+    with _locks_guard:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = _locks[path] = TickerLock(path)
+    return lock
+
+
+@contextmanager
+def atomic_write(path: str):
+    # Yields a unique temp path next to `path`; renamed over it on success.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
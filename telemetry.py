@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import logging
+import threading
+import functools
+from contextlib import contextmanager, nullcontext
+from config import TELEMETRY_ENABLED, TELEMETRY_LOG_PATH, TELEMETRY_METRICS_PATH, LOG_LEVEL
+import store_io
+
+# Timings, provider call metrics, LLM token counts and cache hit rates.
+# Every timed event is written as one JSON log line, and the aggregated
+# metrics are exported in Prometheus text format (metrics_text / flush).
+# With TELEMETRY_ENABLED=0 (the default) timed() hands back a shared no-op
+# context and the other recorders return immediately.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_counters = {}     # (name, labels) -> value
+_histograms = {}   # (name, labels) -> [bucket counts..., count, sum]
+_caches = {}       # name -> object with .stats()
+_NOOP = nullcontext()
+
+# Application log (progress, per-ticker detail, recoverable errors): stderr
+# at LOG_LEVEL. Telemetry events below have their own handler.
+log = logging.getLogger("portfolio")
+if not log.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    log.addHandler(_log_handler)
+    log.setLevel(LOG_LEVEL)
+    log.propagate = False
+_events = logging.getLogger("portfolio.telemetry")
+_events.propagate = False
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _emit(event: dict) -> None:
+    if not _events.handlers:
+        with _lock:
+            if not _events.handlers:
+                handler = logging.FileHandler(TELEMETRY_LOG_PATH) if TELEMETRY_LOG_PATH else logging.StreamHandler()
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                _events.addHandler(handler)
+                _events.setLevel(logging.INFO)
+    _events.info(json.dumps(event, default=str))
+
+
+def count(name: str, value: float = 1, **labels) -> None:
+    if not TELEMETRY_ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    if not TELEMETRY_ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * len(LATENCY_BUCKETS) + [0, 0.0]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                hist[i] += 1
+        hist[-2] += 1
+        hist[-1] += value
+
+
+@contextmanager
+def _timed(metric: str, labels: dict, fields: dict):
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        observe(f"{metric}_seconds", seconds, **labels)
+        count(f"{metric}_total", outcome=outcome, **labels)
+        _emit({"ts": time.time(), "event": metric, **labels, **fields, "seconds": round(seconds, 6), "outcome": outcome})
+
+
+def timed(metric: str, labels: dict | None = None, **fields):
+    '''
+    # Time a block: records {metric}_seconds and {metric}_total{outcome}
+    # and writes a JSON log line.
+
+    # Args:
+    #     metric (str): Metric name, e.g. "node" or "provider_request".
+    #     labels (dict): Low-cardinality metric labels (node, provider).
+    #     **fields: Extra log-only fields (e.g. ticker), not metric labels.
+    '''
+    if not TELEMETRY_ENABLED:
+        return _NOOP
+    return _timed(metric, labels or {}, fields)
+
+
+def traced_node(name: str, node):
+    # Wrap a graph node with a per-node timer; per-ticker nodes also log
+    # the ticker they ran for.
+    if not TELEMETRY_ENABLED:
+        return node
+
+    @functools.wraps(node)
+    def traced(state):
+        stock = state.get("stock") if isinstance(state, dict) else None
+        fields = {"ticker": stock["ticker"]} if stock else {}
+        with timed("node", {"node": name}, **fields):
+            return node(state)
+
+    return traced
+
+
+def record_llm_usage(message, model: str | None = None) -> None:
+    # Prompt/completion token counts from a chat model reply
+    if not TELEMETRY_ENABLED:
+        return
+    usage = getattr(message, "usage_metadata", None) or {}
+    count("llm_tokens_total", usage.get("input_tokens", 0), kind="prompt", model=model)
+    count("llm_tokens_total", usage.get("output_tokens", 0), kind="completion", model=model)
+
+
+def register_cache(name: str, cache) -> None:
+    # Caches expose .stats() with hits, misses and hit_rate; read at export.
+    _caches[name] = cache
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def metrics_text() -> str:
+    '''
+    # All metrics in Prometheus text exposition format.
+    '''
+    lines = []
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(hist) for key, hist in _histograms.items()}
+
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE portfolio_{name} counter")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"portfolio_{name}{_format_labels(labels)} {value}")
+
+    for name in sorted({name for name, _ in histograms}):
+        lines.append(f"# TYPE portfolio_{name} histogram")
+        for (metric, labels), hist in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, bucket in zip(LATENCY_BUCKETS, hist):
+                lines.append(f"portfolio_{name}_bucket{_format_labels(labels, (('le', str(bound)),))} {bucket}")
+            lines.append(f"portfolio_{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {hist[-2]}")
+            lines.append(f"portfolio_{name}_count{_format_labels(labels)} {hist[-2]}")
+            lines.append(f"portfolio_{name}_sum{_format_labels(labels)} {hist[-1]}")
+
+    if _caches:
+        stats = {name: cache.stats() for name, cache in sorted(_caches.items())}
+        lines.append("# TYPE portfolio_cache_lookups_total counter")
+        for name, cache_stats in stats.items():
+            lines.append(f'portfolio_cache_lookups_total{{cache="{name}",result="hit"}} {cache_stats["hits"]}')
+            lines.append(f'portfolio_cache_lookups_total{{cache="{name}",result="miss"}} {cache_stats["misses"]}')
+        lines.append("# TYPE portfolio_cache_hit_rate gauge")
+        for name, cache_stats in stats.items():
+            lines.append(f'portfolio_cache_hit_rate{{cache="{name}"}} {cache_stats["hit_rate"]}')
+    return "\n".join(lines) + "\n"
+
+
+def snapshot() -> dict:
+    # Counters and histogram totals as plain data (e.g. for benchmarks)
+    with _lock:
+        return {
+            "counters": {
+                name: [{"labels": dict(labels), "value": value}
+                       for (metric, labels), value in _counters.items() if metric == name]
+                for name in {name for name, _ in _counters}
+            },
+            "histograms": {
+                name: [{"labels": dict(labels), "count": hist[-2], "sum": hist[-1]}
+                       for (metric, labels), hist in _histograms.items() if metric == name]
+                for name in {name for name, _ in _histograms}
+            },
+        }
+
+
+def flush(path: str | None = None) -> None:
+    # Write the metrics dump to path (default TELEMETRY_METRICS_PATH)
+    path = path or TELEMETRY_METRICS_PATH
+    if not TELEMETRY_ENABLED or not path:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with store_io.atomic_write(path) as tmp, open(tmp, "w") as f:
+        f.write(metrics_text())
@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+
+# config.py reads the environment at import time, so the offline settings
+# are applied before any repo module is imported: a throwaway cache
+# directory, unmetered provider stand-ins and the default (non-panel) state.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+os.environ.update({
+    "PORTFOLIO_CACHE_DIR": tempfile.mkdtemp(prefix="portfolio-tests-"),
+    "PANEL_STATE": "0",
+    "TELEMETRY_ENABLED": "0",
+    "OPENBB_REQUESTS_PER_MINUTE": "0",
+    "FINNHUB_REQUESTS_PER_MINUTE": "0",
+    "GROQ_REQUESTS_PER_MINUTE": "0",
+    "LLM_TOKENS_PER_MINUTE": "0",
+    "PROVIDER_BACKOFF_SECONDS": "0",
+    "RISK_BENCHMARK_TICKER": "BENCH",
+})
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def offline_providers():
+    # OpenBB, Finnhub and Groq replaced by the benchmark stand-ins
+    from benchmarks.fakes import install_fakes
+    from nodes import SUMMARY_TEMPERATURE
+    install_fakes(0.0, 0.0, 0.0, temperatures=(0.0, SUMMARY_TEMPERATURE))
+
+
+@pytest.fixture
+def app_state():
+    from benchmarks.harness import synthetic_portfolio
+    from portfolio_io import read_portfolio
+
+    def build(tickers: int = 3, **overrides) -> dict:
+        return {
+            "user_uploaded_file": "synthetic.csv",
+            "holdings": read_portfolio(synthetic_portfolio(tickers)),
+            "risk_tolerance": "Medium",
+            "investment_horizon": "Medium-term",
+            "objective": "Growth",
+            "liquidity_needs": "1–3 years",
+            "portfolio": [],
+            "summary": [],
+            **overrides,
+        }
+    return build
@@ -0,0 +1,20 @@
+from batch_runner import load_jobs, PREFERENCE_FIELDS
+
+DEFAULTS = {field: "default" for field in PREFERENCE_FIELDS}
+
+
+def test_manifest_rows_with_bad_client_ids_are_reported(tmp_path):
+    manifest = tmp_path / "clients.csv"
+    manifest.write_text(
+        "client_id,portfolio\n"
+        " acme-1 ,a.csv\n"
+        "../../etc,b.csv\n"
+        ",c.csv\n"
+        "acme-1,d.csv\n"
+        "beta,\n"
+    )
+    jobs, rejected = load_jobs(str(manifest), DEFAULTS)
+
+    assert [job["client_id"] for job in jobs] == ["acme-1"]
+    assert jobs[0]["portfolio"] == str(tmp_path / "a.csv")
+    assert [entry["source"].rsplit(" ", 1)[-1] for entry in rejected] == ["3", "4", "5", "6"]
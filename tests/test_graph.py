@@ -0,0 +1,39 @@
+from graph_builder import graph, _summary_inputs
+from panel import stock_prices, stock_news
+
+
+def test_graph_without_panel_keeps_frames_on_stocks(app_state):
+    result = graph.invoke(app_state(3))
+
+    assert result.get("panel") is None
+    assert [s["ticker"] for s in result["portfolio"]] == ["T00000", "T00001", "T00002"]
+    for stock in result["portfolio"]:
+        assert not stock["prices"].empty
+        assert not stock["news"].empty
+        assert stock_prices(result, stock) is stock["prices"]
+        assert stock_news(result, stock) is stock["news"]
+        assert stock["recommendation"]
+    assert result["summary"]
+
+
+def test_summary_memo_key_follows_prices(app_state):
+    result = graph.invoke(app_state(2))
+    stocks, *_ = _summary_inputs(result)
+    assert all(not prices.empty for _, _, prices in stocks)
+
+    stock = result["portfolio"][0]
+    moved = {**result, "portfolio": [{**stock, "prices": stock["prices"].assign(close=stock["prices"]["close"] * 1.1)}]}
+    unchanged = {**result, "portfolio": [stock]}
+    from memo import digest
+    assert digest(_summary_inputs(moved)) != digest(_summary_inputs(unchanged))
+
+
+def test_summary_runs_once_after_every_ticker(app_state):
+    runs = []
+    analyzed = 0
+    for chunk in graph.stream(app_state(3), stream_mode="updates"):
+        if "ticker_pipeline" in chunk:
+            analyzed += 1
+        if "portfolio_summary" in chunk:
+            runs.append(analyzed)
+    assert runs == [3]
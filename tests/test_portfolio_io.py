@@ -0,0 +1,23 @@
+import pandas as pd
+import pytest
+import store_io
+from benchmarks.harness import synthetic_portfolio
+from portfolio_io import read_portfolio, PortfolioValidationError
+
+
+@pytest.mark.parametrize("ticker", ["BRK/B", "../../x", "AAPL MSFT", ""])
+def test_rejects_tickers_that_are_not_symbols(ticker):
+    raw = synthetic_portfolio(3)
+    raw.loc[1, "Ticker"] = ticker
+    with pytest.raises(PortfolioValidationError, match=r"row\(s\) \[3\]"):
+        read_portfolio(raw)
+
+
+def test_accepts_exchange_symbols():
+    raw = synthetic_portfolio(4)
+    raw["Ticker"] = ["brk.b", "BF-B", "^GSPC", "EURUSD=X"]
+    assert read_portfolio(raw)["ticker"].tolist() == ["BRK.B", "BF-B", "^GSPC", "EURUSD=X"]
+
+
+def test_store_file_names_stay_in_their_directory():
+    assert "/" not in store_io.file_name("../../x")
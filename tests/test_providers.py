@@ -0,0 +1,23 @@
+import pytest
+from providers import is_retryable
+
+
+class StatusError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@pytest.mark.parametrize("error, expected", [
+    (StatusError("upstream said 503", 404), False),
+    (StatusError("bad request", 429), True),
+    (StatusError("gateway", 502), True),
+    (RuntimeError("HTTP Error 503: Service Unavailable"), True),
+    (RuntimeError("status_code=429"), True),
+    (RuntimeError("Too Many Requests"), True),
+    (RuntimeError("no quote for BRK.B at 512.30"), False),
+    (RuntimeError("symbol 500 not found"), False),
+    (TimeoutError("read timed out"), True),
+])
+def test_is_retryable(error, expected):
+    assert is_retryable(error) is expected
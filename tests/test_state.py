@@ -0,0 +1,20 @@
+from state import merge_portfolio
+
+
+def _lot(ticker: str, shares: float, **fields) -> dict:
+    return {"ticker": ticker, "shares_held": shares, **fields}
+
+
+def test_positioned_updates_fill_repeated_tickers():
+    book = [_lot("AAA", 1), _lot("BBB", 2), _lot("AAA", 3)]
+    merged = merge_portfolio(book, [_lot("AAA", 3, recommendation="Sell", position=2)])
+    merged = merge_portfolio(merged, [_lot("AAA", 1, recommendation="Buy", position=0)])
+
+    assert [s.get("recommendation") for s in merged] == ["Buy", None, "Sell"]
+    assert all("position" not in s for s in merged)
+
+
+def test_full_list_updates_match_by_ticker_in_order():
+    book = [_lot("AAA", 1), _lot("BBB", 2), _lot("AAA", 3)]
+    update = [_lot("AAA", 1, r=1), _lot("BBB", 2, r=2), _lot("AAA", 3, r=3), _lot("CCC", 4, r=4)]
+    assert [s["r"] for s in merge_portfolio(book, update)] == [1, 2, 3, 4]
@@ -0,0 +1,22 @@
+import uuid
+from langchain_core.prompts import PromptTemplate
+from benchmarks.fakes import SlowFakeChatModel, REPLY
+from utils import invoke_cached_batch
+
+
+class CountingChatModel(SlowFakeChatModel):
+    calls: list = []
+
+    def _call(self, messages, *args, **kwargs):
+        self.calls.append(messages[0].content)
+        return super()._call(messages, *args, **kwargs)
+
+
+def test_batch_sends_identical_prompts_once():
+    llm = CountingChatModel(responses=[REPLY])
+    run = uuid.uuid4().hex  # keeps the prompts out of earlier runs' cache
+    prompt = PromptTemplate.from_template("Report for {ticker} ({run})")
+    inputs = [{"ticker": t, "run": run} for t in ["AAA", "BBB", "AAA", "AAA"]]
+
+    assert invoke_cached_batch(llm, prompt, inputs) == [REPLY] * 4
+    assert sorted(llm.calls) == [f"Report for AAA ({run})", f"Report for BBB ({run})"]
@@ -3,78 +3,404 @@ from state import StockInfo, AppState
 import time
 import pandas as pd
 from datetime import timedelta, datetime 
-import finnhub
 import os
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, wait
+from config import (
+    OPENBB_MAX_CONCURRENCY,
+    PRICE_PROMPT_TOKEN_BUDGET,
+    NEWS_PROMPT_TOKEN_BUDGET,
+    CACHE_DIR,
+    LLM_CACHE_MAX_MB,
+    LLM_CACHE_TTL_HOURS,
+    LLM_MAX_CONCURRENCY,
+    LLM_TOKENS_PER_MINUTE,
+    PRICE_BULK_CHUNK,
+    SCREENER_CACHE_TTL_MINUTES,
+    SUGGESTIONS_DEADLINE_SECONDS,
+    NEWS_DEDUP_SIMILARITY,
+)
+from cache import DiskCache, content_key
+import price_store
+import providers
+import telemetry
+import news_store
+from news_dedup import cluster_headlines
+from indicators import compute_indicators, format_indicator_block
+from serialization import encode_prices, encode_news, estimate_tokens
 # from langchain_core import HumanMessage
 from langchain_core.prompts import PromptTemplate
+from clients import get_llm, get_finnhub_client, get_obb
+
+
+def date_to_unix(date_str: str) -> int:
+    return int(time.mktime(datetime.strptime(date_str, "%Y-%m-%d").timetuple()))
+
+
+def map_concurrently(func, items: list, max_workers: int) -> list:
+    '''
+    # Apply func to every item on a bounded thread pool.
+
+    # Args:
+    #     func: Callable taking a single item.
+    #     items (list): Inputs, e.g. tickers.
+    #     max_workers (int): Upper bound on concurrent calls.
+
+    # Returns:
+    #     list: One entry per item, in input order. Calls that raised are
+    #     returned as the exception instance so callers can fall back per item.
+    '''
+    def _safe_call(item):
+        try:
+            return func(item)
+        except Exception as e:
+            return e
+
+    if max_workers <= 1 or len(items) <= 1:
+        return [_safe_call(item) for item in items]
 
-from langchain_groq import ChatGroq
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(_safe_call, items))
 
-llm = ChatGroq(
-    temperature=0,
-    model_name="llama-3.1-8b-instant",
-    api_key=os.environ.get("GROQ_API_KEY"),
+
+# Content-addressed cache of LLM completions shared by every chain
+llm_cache = DiskCache(
+    os.path.join(CACHE_DIR, "llm_responses.sqlite"),
+    max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=LLM_CACHE_TTL_HOURS * 3600,
 )
+telemetry.register_cache("llm", llm_cache)
 
-# Initialize the Finnhub client
-load_dotenv()
-finnhub_client = finnhub.Client(api_key=os.getenv("FINNHUB_API_KEY")) 
 
+def llm_cache_key(llm, rendered_prompt: str) -> str:
+    return content_key(getattr(llm, "model_name", None), getattr(llm, "temperature", None), rendered_prompt)
 
-def date_to_unix(date_str: str) -> int:
-    return int(time.mktime(datetime.strptime(date_str, "%Y-%m-%d").timetuple()))
 
+def _invoke_llm(llm, rendered: str):
+    # Every uncached LLM request, per-ticker or batched, first spends its
+    # estimated prompt tokens from the per-minute budget (shared across
+    # threads and worker processes), then goes through the groq limits.
+    with telemetry.timed("provider_wait", {"provider": "groq_tokens"}):
+        providers.rate_limiter.acquire("groq_tokens", LLM_TOKENS_PER_MINUTE, estimate_tokens(rendered))
+    return providers.call("groq", llm.invoke, rendered)
 
-from openbb import obb
-import pandas as pd
-from datetime import datetime
 
-# Login (only needs to be done once per session)
-# obb.login("OPENBB_API_KEY")
+def invoke_cached(llm, prompt: PromptTemplate, inputs: dict) -> str:
+    '''
+    # Render the prompt and return the LLM's reply, reusing a cached reply
+    # when the same model and temperature already answered this exact prompt.
+
+    # Args:
+    #     llm: Chat model.
+    #     prompt (PromptTemplate): Prompt to render.
+    #     inputs (dict): Template variables.
+
+    # Returns:
+    #     str: Reply content.
+    '''
+    rendered = prompt.format(**inputs)
+    key = llm_cache_key(llm, rendered)
+    content = llm_cache.get(key)
+    if content is None:
+        reply = _invoke_llm(llm, rendered)
+        telemetry.record_llm_usage(reply, getattr(llm, "model_name", None))
+        content = reply.content
+        llm_cache.put(key, content)
+    return content
+
+
+def invoke_cached_batch(llm, prompt: PromptTemplate, inputs_list: list[dict]) -> list:
+    '''
+    # Batched invoke_cached: cached prompts are answered locally, identical
+    # prompts are sent once, and the rest are sent concurrently, at most
+    # LLM_MAX_CONCURRENCY requests at a time, each under the same token
+    # budget and groq limits as invoke_cached.
+
+    # Args:
+    #     llm: Chat model.
+    #     prompt (PromptTemplate): Prompt to render.
+    #     inputs_list (list[dict]): Template variables, one dict per request.
+
+    # Returns:
+    #     list: Reply content per request, in input order. A request that
+    #     failed is returned as its exception, so one bad ticker does not
+    #     affect the others.
+    '''
+    rendered = [prompt.format(**inputs) for inputs in inputs_list]
+    keys = [llm_cache_key(llm, text) for text in rendered]
+    results = [llm_cache.get(key) for key in keys]
+    # One request per distinct key; duplicates share its reply
+    pending = {}
+    for i, result in enumerate(results):
+        if result is None:
+            pending.setdefault(keys[i], []).append(i)
+
+    replies = map_concurrently(
+        lambda text: _invoke_llm(llm, text),
+        [rendered[indices[0]] for indices in pending.values()],
+        max_workers=LLM_MAX_CONCURRENCY,
+    )
+    for (key, indices), reply in zip(pending.items(), replies):
+        if isinstance(reply, Exception):
+            content = reply
+        else:
+            telemetry.record_llm_usage(reply, getattr(llm, "model_name", None))
+            content = reply.content
+            llm_cache.put(key, content)
+        for i in indices:
+            results[i] = content
+
+    return results
+
+
+def download_price_history(ticker: str, start: str, end: str) -> pd.DataFrame:
+    # Single provider round trip. An empty result is not an error here: a
+    # delta window can legitimately fall on a weekend or holiday.
+    obb_obj = providers.call(
+        "openbb", get_obb().equity.price.historical,
+        symbol=ticker,
+        start_date=start,
+        end_date=end,
+        interval="1d"
+    )
+    df = _normalize_prices(obb_obj.to_df())
+    return df[price_store.PRICE_COLUMNS]
+
+
+def _normalize_prices(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame(columns=price_store.PRICE_COLUMNS + ["symbol"])
+
+    # If 'date' is missing, reset index and try again
+    if 'date' not in df.columns:
+        df = df.reset_index()
+
+    # Check again after reset
+    if 'date' not in df.columns:
+        raise ValueError("Missing 'date' column even after reset")
+
+    df["date"] = pd.to_datetime(df["date"]).dt.strftime('%Y-%m-%d')
+    return df
+
+
+def download_price_histories(tickers: list[str], start: str, end: str) -> dict:
+    '''
+    # Daily OHLCV for several tickers in one multi-symbol OpenBB request.
+
+    # Args:
+    #     tickers (list[str]): Symbols sent together, comma-separated.
+    #     start (str): Start date, YYYY-MM-DD.
+    #     end (str): End date, YYYY-MM-DD.
+
+    # Returns:
+    #     dict: Ticker -> date/open/high/low/close/volume frame, or the
+    #     exception for that ticker. Frames are empty only when no symbol
+    #     had rows (a window without trading days). If the combined request
+    #     fails, or leaves out a symbol while others have rows, those
+    #     tickers are retried on their own so one bad symbol does not fail
+    #     the rest.
+    '''
+    if len(tickers) == 1:
+        try:
+            return {tickers[0]: download_price_history(tickers[0], start, end)}
+        except Exception as e:
+            return {tickers[0]: e}
 
-def get_price_history(ticker: str, start: str, end: str) -> pd.DataFrame:
     try:
-        obb_obj = obb.equity.price.historical(
-            symbol=ticker,
+        obb_obj = providers.call(
+            "openbb", get_obb().equity.price.historical,
+            symbol=",".join(tickers),
             start_date=start,
             end_date=end,
             interval="1d"
         )
-        df = obb_obj.to_df()
+        df = _normalize_prices(obb_obj.to_df())
+        if "symbol" not in df.columns:
+            raise ValueError("Missing 'symbol' column in multi-symbol result")
+    except Exception as e:
+        telemetry.count("price_bulk_fallbacks_total")
+        telemetry.log.warning("Bulk price download failed for %d tickers, retrying one by one - %s", len(tickers), e)
+        results = map_concurrently(lambda t: download_price_history(t, start, end), tickers, OPENBB_MAX_CONCURRENCY)
+        return dict(zip(tickers, results))
+
+    frames = {
+        str(symbol).upper(): group[price_store.PRICE_COLUMNS].reset_index(drop=True)
+        for symbol, group in df.groupby("symbol", sort=False)
+    }
+    if not frames:
+        # Nothing for any symbol: a window without trading days
+        empty = pd.DataFrame(columns=price_store.PRICE_COLUMNS)
+        return {ticker: empty for ticker in tickers}
+
+    # Other symbols have rows for this window, so a missing one failed
+    # (e.g. an unknown symbol the provider dropped). Retry it on its own;
+    # if that is empty too, report it rather than caching an empty range.
+    results = {ticker: frames[ticker.upper()] for ticker in tickers if ticker.upper() in frames}
+    missing = [ticker for ticker in tickers if ticker not in results]
+    retried = map_concurrently(lambda t: download_price_history(t, start, end), missing, OPENBB_MAX_CONCURRENCY)
+    for ticker, prices in zip(missing, retried):
+        if not isinstance(prices, Exception) and prices.empty:
+            prices = ValueError(f"No rows for {ticker} from {start} to {end} in the bulk or single-symbol request")
+        results[ticker] = prices
+    return results
 
-        if df.empty:
-            raise ValueError("No data returned")
 
-        # If 'date' is missing, reset index and try again
-        if 'date' not in df.columns:
-            df = df.reset_index()
+def get_price_history(ticker: str, start: str, end: str) -> pd.DataFrame:
+    '''
+    # Daily OHLCV for [start, end], served from the local price store. Only
+    # the date ranges the store has not seen yet are fetched from OpenBB.
 
-        # Check again after reset
-        if 'date' not in df.columns:
-            raise ValueError("Missing 'date' column even after reset")
+    # Args:
+    #     ticker (str): Stock ticker symbol.
+    #     start (str): Start date, YYYY-MM-DD.
+    #     end (str): End date, YYYY-MM-DD.
 
-        df = df.rename(columns={
-            "date": "date",
-            "open": "open",
-            "high": "high",
-            "low": "low",
-            "close": "close",
-            "volume": "volume"
-        })
+    # Returns:
+    #     pd.DataFrame: date, open, high, low, close, volume.
+    '''
+    try:
+        with price_store.ticker_lock(ticker):
+            for gap_start, gap_end in price_store.missing_ranges(ticker, start, end):
+                fetched = download_price_history(ticker, gap_start, gap_end)
+                price_store.append(ticker, fetched, gap_start, gap_end)
+            df = price_store.read(ticker, start, end)
 
-        df["date"] = pd.to_datetime(df["date"]).dt.strftime('%Y-%m-%d')
+        if df.empty:
+            raise ValueError("No data returned")
 
-        return df[["date", "open", "high", "low", "close", "volume"]]
+        return df
 
     except Exception as e:
         raise ValueError(f"Error fetching price history for {ticker} - {e}")
 
 
+def get_price_histories(tickers: list[str], start: str, end: str, chunk_size: int = PRICE_BULK_CHUNK) -> dict:
+    '''
+    # get_price_history for many tickers, downloading the missing ranges in
+    # ceil(N / chunk_size) multi-symbol requests instead of one per ticker.
+    # Tickers are grouped by their missing range, which on a normal run is
+    # the same for the whole book (a cold window or today's delta).
+
+    # Args:
+    #     tickers (list[str]): Stock ticker symbols.
+    #     start (str): Start date, YYYY-MM-DD.
+    #     end (str): End date, YYYY-MM-DD.
+    #     chunk_size (int): Symbols per provider request.
+
+    # Returns:
+    #     dict: Ticker -> price frame, or the ValueError for that ticker.
+    '''
+    tickers = list(dict.fromkeys(tickers))
+    gaps = {}
+    for ticker in tickers:
+        for gap in price_store.missing_ranges(ticker, start, end):
+            gaps.setdefault(gap, []).append(ticker)
+
+    requests = [
+        (gap, group[i:i + chunk_size])
+        for gap, group in gaps.items()
+        for i in range(0, len(group), max(chunk_size, 1))
+    ]
+    downloads = map_concurrently(
+        lambda request: download_price_histories(request[1], *request[0]), requests, OPENBB_MAX_CONCURRENCY
+    )
+
+    failures = {}
+    for (gap, chunk), fetched in zip(requests, downloads):
+        if isinstance(fetched, Exception):
+            fetched = {ticker: fetched for ticker in chunk}
+        for ticker, prices in fetched.items():
+            if isinstance(prices, Exception):
+                failures[ticker] = prices
+                continue
+            with price_store.ticker_lock(ticker):
+                price_store.append(ticker, prices, *gap)
+
+    results = {}
+    for ticker in tickers:
+        if ticker in failures:
+            results[ticker] = ValueError(f"Error fetching price history for {ticker} - {failures[ticker]}")
+            continue
+        with price_store.ticker_lock(ticker):
+            df = price_store.read(ticker, start, end)
+        results[ticker] = df if not df.empty else ValueError(
+            f"Error fetching price history for {ticker} - No data returned"
+        )
+    return results
+
+
+# Enriched screener results per filter set
+screener_cache = DiskCache(
+    os.path.join(CACHE_DIR, "screener.sqlite"),
+    max_bytes=16 * 1024 * 1024,
+    ttl_seconds=SCREENER_CACHE_TTL_MINUTES * 60,
+)
+telemetry.register_cache("screener", screener_cache)
+
+
+def _screen(filters: list[str], limit: int) -> list[str]:
+    screener_df = providers.call("openbb", get_obb().stocks.screener, limit=limit, filters=filters)
+    return screener_df["symbol"].tolist()
+
+
+def _headlines(ticker: str) -> list[str]:
+    news = providers.call("openbb", get_obb().stocks.news, ticker)
+    return news["title"].head(2).tolist() if "title" in news else []
+
+
+def screen_stocks(filters: list[str], limit: int = 20, deadline: float = SUGGESTIONS_DEADLINE_SECONDS) -> list[dict]:
+    '''
+    # Screener symbols for a filter set, each with its two latest headlines.
+
+    # Args:
+    #     filters (list[str]): OpenBB screener filters.
+    #     limit (int): Max symbols returned by the screener.
+    #     deadline (float): Seconds to wait for the screener and the
+    #         headline lookups together.
+
+    # Returns:
+    #     list[dict]: {"ticker", "news"} per screener row. Served from the
+    #     screener cache when warm. Headlines that miss the deadline or fail
+    #     are left empty, and such a partial result is not cached.
 
-def get_news(ticker: str) -> pd.DataFrame:
+    # Raises:
+    #     TimeoutError: If the screener itself misses the deadline.
+    '''
+    key = content_key("screener", tuple(filters), limit)
+    cached = screener_cache.get(key)
+    if cached is not None:
+        return cached
+
+    started = time.monotonic()
+    # Not used as a context manager: on timeout the node returns without
+    # waiting, and calls still in flight finish in the background.
+    pool = ThreadPoolExecutor(max_workers=OPENBB_MAX_CONCURRENCY)
+    try:
+        symbols = pool.submit(_screen, filters, limit).result(timeout=deadline)
+        futures = {ticker: pool.submit(_headlines, ticker) for ticker in symbols}
+        done, _ = wait(futures.values(), timeout=max(deadline - (time.monotonic() - started), 0))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    rows = []
+    complete = True
+    for ticker, future in futures.items():
+        if future in done and future.exception() is None:
+            rows.append({"ticker": ticker, "news": future.result()})
+        else:
+            complete = False
+            rows.append({"ticker": ticker, "news": []})
+    if complete:
+        screener_cache.put(key, rows)
+    else:
+        telemetry.log.warning("Screener headlines incomplete after %ss; result not cached", deadline)
+    return rows
+
+
+def get_news(ticker: str, days: int = 10) -> pd.DataFrame:
     '''
     # Fetch recent news for a given stock ticker using the Finnhub API.
+    # Articles are cached per ticker and day; only days not seen yet (and a
+    # stale copy of today) are requested from Finnhub.
 
     # Args:
     #     ticker (str): Stock ticker symbol.
@@ -82,103 +408,88 @@ def get_news(ticker: str) -> pd.DataFrame:
 
     # Returns:
     #     pd.DataFrame: News articles with datetime, headline, source, and URL.
+    #     Syndicated copies of a story are collapsed into one row with
+    #     source_count / article_count, ranked by recency and coverage.
     '''
-    days=10
     to_date = datetime.now()
     from_date = to_date - timedelta(days=days)
+    window = [(from_date + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days + 1)]
 
-    # Format dates as YYYY-MM-DD
-    from_str = from_date.strftime('%Y-%m-%d')
-    to_str = to_date.strftime('%Y-%m-%d')
+    with news_store.ticker_lock(ticker):
+        missing = news_store.missing_days(ticker, window)
+        if missing:
+            # One request spanning all missing days costs a single API call
+            news_list = providers.call(
+                "finnhub", get_finnhub_client().company_news, ticker, _from=missing[0], to=missing[-1]
+            )
+            news_store.append(ticker, news_list or [], missing)
 
-    # Get news from API
-    news_list = finnhub_client.company_news(ticker, _from=from_str, to=to_str)
+        df = news_store.read(ticker, since=datetime.strptime(window[0], '%Y-%m-%d'))
 
-    if not news_list:
+    if df.empty:
         return pd.DataFrame()
 
-    # Convert list of dicts to DataFrame
-    df = pd.DataFrame(news_list)
-
-    # Select and rename relevant columns
-    df = df[["datetime", "headline", "source", "url"]]
     df["datetime"] = pd.to_datetime(df["datetime"], unit='s')
-    df = df.sort_values("datetime", ascending=False)
+
+    if NEWS_DEDUP_SIMILARITY:
+        clustered = cluster_headlines(df, NEWS_DEDUP_SIMILARITY / 100)
+        telemetry.count("news_articles_total", len(df))
+        telemetry.count("news_stories_total", len(clustered))
+        telemetry.log.debug("%s: %d articles -> %d stories", ticker, len(df), len(clustered))
+        df = clustered
 
     return df
 
-def get_price_analysis(ticker: str, prices: pd.DataFrame) -> str:
-    '''
-    # Simulate a price analysis report for a given stock ticker.
+PRICE_ANALYSIS_PROMPT = PromptTemplate(
+    template="""
+        You are a highly skilled and detail-oriented financial analyst and equity researcher. You have been given technical indicators computed from about 6 months of historical daily stock price data (open, high, low, close, volume) for the company {ticker}:
 
-    # Args:
-    #     ticker (str): Stock ticker symbol.
-    #     prices (pd.DataFrame): DataFrame containing historical prices.
+        {indicators}
 
-    # Returns:
-    #     str: Simulated price analysis report.
-    '''
-    if prices.empty:
-        return "No price data available"
-    print(len(prices))
-    # csv_data = prices.reset_index().to_csv(index=False)
-    # print(csv_data[:15])  # first 300 characters of the CSV
+        All figures above are exact; do not recompute or estimate them. Percentages next to an SMA are the last close relative to that average.
 
-    # Simulate a price analysis report
-    prompt=PromptTemplate(
-        template="""
-        You are a highly skilled and detail-oriented financial analyst and equity researcher. You have been given a pandas dataframe named {prices} that contains 4 months of historical daily stock price data for the company {ticker}. The DataFrame contains the following columns:
+        For context, the price history itself (recent sessions as daily bars, older ones rolled up):
 
-        - `date`: trading date (string, format YYYY-MM-DD)
-        - `open`: opening price of the stock
-        - `high`: intraday high price
-        - `low`: intraday low price
-        - `close`: closing price
-        - `volume`: number of shares traded
+        {price_table}
 
-        Your task is to analyze the stock’s **performance over the last 4 months** and extract meaningful short-term and long-term trends. Perform the analysis as follows:
+        Your task is to analyze the stock’s **performance over this window** and extract meaningful short-term and long-term trends. Perform the analysis as follows:
 
         ---
 
         ### 1. **Overview of Price Behavior**
-        - Describe the overall trend (upward, downward, sideways) across the full 4 months.
-        - Mention any periods of high volatility or price compression.
-        - Identify the highest and lowest closing prices and when they occurred.
+        - Describe the overall trend (upward, downward, sideways) across the window.
+        - Mention whether volatility is elevated or compressed.
+        - State the highest and lowest closing prices and when they occurred.
 
         ---
 
-        ### 2. **Short-Term Trends (last 2–4 weeks)**
-        - Is the stock showing recent momentum? If yes, is it bullish or bearish?
-        - Note any recent support or resistance levels forming.
-        - Mention any breakouts or breakdowns in price levels.
-        - Has the stock shown higher highs/lows or lower highs/lows recently?
+        ### 2. **Short-Term Trends (last 1–4 weeks)**
+        - Is the stock showing recent momentum (5-day and 21-day returns)? If yes, is it bullish or bearish?
+        - Relate the last close to the 20-day support and resistance levels.
+        - Mention any breakouts or breakdowns suggested by these levels.
 
         ---
 
         ### 3. **Medium-to-Long-Term Trend Analysis**
-        - Analyze the trend over the entire 4-month window:
-        - Use structure: higher highs and higher lows vs lower highs and lower lows.
+        - Use the window return, drawdowns and position versus the 50-day average.
         - Observe whether the stock is forming a base, breakout, pullback, or reversal.
-        - Evaluate consistency of the trend and whether volume supports the trend.
 
         ---
 
         ### 4. **Moving Averages and Crossovers**
-        - Simulate 10-day, 20-day, and 50-day simple moving averages.
-        - If possible, detect golden cross or death cross behavior.
+        - Interpret the 10-day, 20-day, and 50-day simple moving averages.
+        - Interpret the most recent golden or death cross, if any.
         - Indicate whether the current price is above or below these key averages.
 
         ---
 
         ### 5. **Volume Analysis**
-        - Identify surges in volume and whether they coincide with price movement (confirmations or divergence).
-        - Is volume increasing or decreasing as price trends evolve?
+        - Interpret the latest volume z-score and the number of recent volume surges.
 
         ---
 
         ### 6. **Volatility Patterns**
-        - Identify periods of contraction or expansion in trading range.
-        - Discuss ATR (Average True Range) or general volatility behavior even qualitatively.
+        - Interpret the ATR and annualized volatility.
 
         ---
 
@@ -189,41 +500,47 @@ def get_price_analysis(ticker: str, prices: pd.DataFrame) -> str:
 
         ---
 
-        Avoid financial advice. Focus purely on data analysis and chart-based behavior. Be precise with your answers, using the data provided in the CSV file.
+        Avoid financial advice. Focus purely on data analysis and chart-based behavior. Be precise with your answers, using only the indicators provided.
         Output your findings in a structured point wise format so it could be used as a prompt for further analysis or decision-making.
         """,
-        input_variables=["prices","ticker"]
-    )
-    chain = prompt | llm
-    result = chain.invoke({"prices": prices, "ticker": ticker})
+    input_variables=["indicators","price_table","ticker"]
+)
 
-    print("log test")
-    return result.content
 
-def get_news_analysis(ticker: str, news: pd.DataFrame) -> str:
+def get_price_analysis(ticker: str, prices: pd.DataFrame, features: dict | None = None) -> str:
     '''
-    # Simulate a news analysis report for a given stock ticker.
+    # Generate a price analysis report for a given stock ticker from
+    # precomputed technical indicators.
 
     # Args:
     #     ticker (str): Stock ticker symbol.
-    #     news (pd.DataFrame): DataFrame containing recent news articles.
+    #     prices (pd.DataFrame): DataFrame containing historical prices.
+    #     features (dict | None): Output of indicators.compute_indicators for
+    #         these prices, when already computed for the whole portfolio.
 
     # Returns:
-    #     str: Simulated news analysis report.
+    #     str: Price analysis report.
     '''
-    if news.empty:
-        return "No news data available"
+    if prices.empty:
+        return "No price data available"
+
+    return invoke_cached(get_llm(), PRICE_ANALYSIS_PROMPT, price_analysis_inputs(ticker, prices, features))
 
-    # csv_data = news.reset_index().to_csv(index=False)
+def price_analysis_inputs(ticker: str, prices: pd.DataFrame, features: dict | None = None) -> dict:
+    # Template variables for PRICE_ANALYSIS_PROMPT
+    if features is None:
+        features = compute_indicators(prices)
 
-    prompt=PromptTemplate(
-        template="""
-        You are a financial analyst specializing in market sentiment analysis. You have been given a pd dataframe named {news} that contains recent news articles related to the company {ticker}. The DataFrame contains the following columns:
+    price_table, tokens = encode_prices(prices, PRICE_PROMPT_TOKEN_BUDGET)
+    telemetry.count("prompt_data_tokens_total", tokens, prompt="price")
+    telemetry.log.debug("%s price table: ~%d tokens", ticker, tokens)
+    return {"indicators": format_indicator_block(features), "price_table": price_table, "ticker": ticker}
 
-        - `datetime`: date and time of the article
-        - `headline`: title of the article
-        - `source`: source of the article
-        - `url`: link to the full article
+NEWS_ANALYSIS_PROMPT = PromptTemplate(
+    template="""
+        You are a financial analyst specializing in market sentiment analysis. You have been given the most relevant recent news headlines related to the company {ticker}, newest first, one per line as `date time | source | headline`:
+
+        {news}
 
         Your task is to analyze the sentiment and impact of these news articles on the stock's performance. Perform the analysis as follows:
 
@@ -262,29 +579,35 @@ def get_news_analysis(ticker: str, news: pd.DataFrame) -> str:
         Avoid financial advice. Focus purely on data analysis and sentiment extraction from the provided articles.
         Output your findings in a structured point wise format so it could be used as a prompt for further analysis or decision-making.
         """,
-        input_variables=["news"]
-    )
-    chain = prompt | llm
-    result = chain.invoke({"news": news, "ticker": ticker})
-    return result.content
+    input_variables=["news","ticker"]
+)
 
-def get_stock_advice(ticker:str, price_analysis: str, news_analysis: str, risk_tolerance: str, investment_horizon: str, objective: str, liquidity_needs:str) -> str:
+
+def get_news_analysis(ticker: str, news: pd.DataFrame) -> str:
     '''
-    # Generate stock advice based on price and news analysis.
+    # Generate a news analysis report for a given stock ticker.
 
     # Args:
     #     ticker (str): Stock ticker symbol.
-    #     price_analysis (str): Price analysis report.
-    #     news_analysis (str): News analysis report.
-    #     risk_tolerance (str): User's risk tolerance level.
-    #     investment_horizon (str): User's investment horizon.
+    #     news (pd.DataFrame): DataFrame containing recent news articles.
 
     # Returns:
-    #     str: Stock advice.
+    #     str: News analysis report.
     '''
-    
-    prompt=PromptTemplate(
-        template="""
+    if news.empty:
+        return "No news data available"
+
+    return invoke_cached(get_llm(), NEWS_ANALYSIS_PROMPT, news_analysis_inputs(ticker, news))
+
+def news_analysis_inputs(ticker: str, news: pd.DataFrame) -> dict:
+    # Template variables for NEWS_ANALYSIS_PROMPT
+    headlines, tokens = encode_news(news, NEWS_PROMPT_TOKEN_BUDGET)
+    telemetry.count("prompt_data_tokens_total", tokens, prompt="news")
+    telemetry.log.debug("%s headlines: ~%d tokens", ticker, tokens)
+    return {"news": headlines, "ticker": ticker}
+
+STOCK_ADVICE_PROMPT = PromptTemplate(
+    template="""
         You are a financial advisor specializing in stock recommendations. Based on the following analyses for {ticker}:
 
         ---
@@ -323,11 +646,32 @@ def get_stock_advice(ticker:str, price_analysis: str, news_analysis: str, risk_t
         You should clearly mention the analysis that led to your recommendation. 
         In short you should briefly explain both price and news analyses and how they relate to the recommendation.
         """,
-        input_variables=["ticker", "price_analysis", "news_analysis", "risk_tolerance", "investment_horizon", "objective", "liquidity_needs"]
-    )
+    input_variables=["ticker", "price_analysis", "news_analysis", "risk_tolerance", "investment_horizon", "objective", "liquidity_needs"]
+)
+
+
+def get_stock_advice(ticker:str, price_analysis: str, news_analysis: str, risk_tolerance: str, investment_horizon: str, objective: str, liquidity_needs:str) -> str:
+    '''
+    # Generate stock advice based on price and news analysis.
+
+    # Args:
+    #     ticker (str): Stock ticker symbol.
+    #     price_analysis (str): Price analysis report.
+    #     news_analysis (str): News analysis report.
+    #     risk_tolerance (str): User's risk tolerance level.
+    #     investment_horizon (str): User's investment horizon.
+
+    # Returns:
+    #     str: Stock advice.
+    '''
     
-    chain = prompt | llm
-    result = chain.invoke({
+    return invoke_cached(get_llm(), STOCK_ADVICE_PROMPT, stock_advice_inputs(
+        ticker, price_analysis, news_analysis, risk_tolerance, investment_horizon, objective, liquidity_needs
+    ))
+
+def stock_advice_inputs(ticker:str, price_analysis: str, news_analysis: str, risk_tolerance: str, investment_horizon: str, objective: str, liquidity_needs:str) -> dict:
+    # Template variables for STOCK_ADVICE_PROMPT
+    return {
         "ticker": ticker,
         "price_analysis": price_analysis,
         "news_analysis": news_analysis,
@@ -335,6 +679,5 @@ def get_stock_advice(ticker:str, price_analysis: str, news_analysis: str, risk_t
         "investment_horizon": investment_horizon,
         "objective": objective,
         "liquidity_needs": liquidity_needs
-    })
-    
-    return result.content
+    }
+
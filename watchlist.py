@@ -0,0 +1,46 @@
+import os
+import time
+import sqlite3
+import threading
+from config import CACHE_DIR
+
+# Tickers seen in uploaded portfolios, with the time they were last seen.
+# Every graph run records its book here; prewarm.py keeps the data and
+# analyst reports for recently seen tickers warm.
+
+
+class Watchlist:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tickers (ticker TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+            )
+        return self._conn
+
+    def add(self, tickers) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection().executemany(
+                "INSERT OR REPLACE INTO tickers (ticker, last_seen) VALUES (?, ?)",
+                [(str(ticker).upper(), now) for ticker in set(tickers)],
+            )
+
+    def tickers(self, max_age_days: float) -> list[str]:
+        # Seen within max_age_days, most recently seen first
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM tickers WHERE last_seen < ?", (cutoff,))
+            rows = conn.execute("SELECT ticker FROM tickers ORDER BY last_seen DESC, ticker").fetchall()
+        return [row[0] for row in rows]
+
+
+watchlist = Watchlist(os.path.join(CACHE_DIR, "watchlist.sqlite"))